@@ -1,13 +1,25 @@
 import sys
 import os
 import json
-from main_window import MainWindow
-from llama_cpp_agent import LlamaCppAgent
-from PyQt5.QtWidgets import QApplication
-from erreurManager.error_handler import ErrorHandler
-from gestionnaire_ressources.resource_manager import IAResourceManager
+from contextlib import nullcontext
+
+from utils.startup_profiler import StartupProfiler
+
 
 def main():
+    # --profile-startup : temps d'import par module et durée de chaque étape d'initialisation
+    profiler = StartupProfiler() if "--profile-startup" in sys.argv else None
+    if profiler:
+        profiler.install()
+    stage = profiler.stage if profiler else (lambda name: nullcontext())
+
+    with stage("imports"):
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QTimer
+        from erreurManager.error_handler import ErrorHandler
+        from llama_cpp_agent import LlamaCppAgent
+        from main_window import MainWindow
+
     error_handler = ErrorHandler()
 
     try:
@@ -26,11 +38,21 @@ def main():
         if last_model not in model_paths:
             raise ValueError(f"Modèle sélectionné '{last_model}' invalide.")
 
-        agent = LlamaCppAgent(model_paths=model_paths, selected_model=last_model)
-
-        app = QApplication(sys.argv)
-        window = MainWindow(model_paths, agent)
-        window.show()
+        with stage("QApplication"):
+            app = QApplication(sys.argv)
+        with stage("LlamaCppAgent"):
+            # Le GGUF est chargé en arrière-plan par la fenêtre (ModelLoader) une fois affichée
+            agent = LlamaCppAgent(model_paths=model_paths, selected_model=last_model, load_now=False,
+                                  warmup=config.get("model_warmup", True))
+
+        with stage("MainWindow"):
+            window = MainWindow(model_paths, agent)
+        with stage("show"):
+            window.show()
+
+        if profiler:
+            # Rapport une fois la première frame affichée
+            QTimer.singleShot(0, profiler.report)
         sys.exit(app.exec_())
 
     except Exception as e:
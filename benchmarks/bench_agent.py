@@ -0,0 +1,372 @@
+"""Benchmark de LlamaCppAgent.generate / generate_code sur un corpus fixe.
+
+    python -m benchmarks.bench_agent --stub                 # sans GGUF (StubLlama déterministe)
+    python -m benchmarks.bench_agent --model-path modelManager/mistral-7b-instruct-v0.2.Q8_0.gguf
+    python -m benchmarks.bench_agent --stub --save-baseline # enregistre la référence
+
+À lancer depuis la racine du projet. Les résultats (JSON) sont comparés à la référence du mode
+choisi (benchmarks/baselines/<mode>.json) ; le code de sortie vaut 1 en cas de régression.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+
+import psutil
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.json")
+STUB_MODEL_PATH = "cache/benchmarks/stub-model.gguf"
+
+
+class TimedModel:
+    """Enveloppe du modèle qui chronomètre chaque create_completion (premier token, fin, nombre de tokens).
+
+    Les appels non diffusés (generate_code) sont servis par le flux du modèle puis réassemblés, comme
+    le fait llama-cpp-python en interne : premier token et débits sont ainsi mesurés dans les deux cas.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.last = None
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def create_completion(self, prompt, stream=False, **kwargs):
+        record = {"prompt_tokens": len(self.model.tokenize(prompt.encode("utf-8"))),
+                  "completion_tokens": 0, "first_token": None, "end": None}
+        self.last = record
+        record["start"] = time.perf_counter()
+        chunks = self._timed_stream(self.model.create_completion(prompt=prompt, stream=True, **kwargs), record)
+        if stream:
+            return chunks
+
+        text = ""
+        finish_reason = None
+        for chunk in chunks:
+            choice = chunk["choices"][0]
+            text += choice.get("text", "")
+            finish_reason = choice.get("finish_reason") or finish_reason
+        return {
+            "choices": [{"text": text, "index": 0, "finish_reason": finish_reason or "stop"}],
+            "usage": {"prompt_tokens": record["prompt_tokens"], "completion_tokens": record["completion_tokens"]},
+        }
+
+    def _timed_stream(self, stream, record):
+        for chunk in stream:
+            if not chunk.get("choices"):
+                continue
+            if record["first_token"] is None:
+                record["first_token"] = time.perf_counter()
+            record["completion_tokens"] += 1  # llama-cpp-python renvoie un token par fragment
+            yield chunk
+        record["end"] = time.perf_counter()
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # ko sous Linux
+    except ImportError:  # Windows
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+
+
+def percentile(values, p):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, int(round(p / 100.0 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def create_stub_model_file(path=STUB_MODEL_PATH, size=4 * 1024 * 1024):
+    # Fichier factice au contenu fixe : empreinte stable pour les caches de préambules
+    if not os.path.exists(path) or os.path.getsize(path) != size:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"GGUF" + bytes(size - 4))
+    return path
+
+
+def create_agent(args, storage):
+    from modelManager.model_registry import ModelRegistry
+    if args.stub:
+        from benchmarks.stub_llama import StubLlama
+        # Le registre est un singleton : la fabrique doit être posée avant la création de l'agent
+        ModelRegistry(llama_factory=partial(StubLlama, prompt_eval_ms=args.stub_prompt_ms, decode_ms=args.stub_decode_ms))
+        model_path = create_stub_model_file()
+    else:
+        model_path = args.model_path
+
+    from llama_cpp_agent import LlamaCppAgent
+    start = time.perf_counter()
+    agent = LlamaCppAgent(model_paths={"bench": model_path}, selected_model="bench",
+                          warmup=not args.no_warmup, storage=storage)
+    load_seconds = time.perf_counter() - start
+    if agent.model is None:
+        raise RuntimeError(f"Modèle non chargé : {model_path}")
+    agent.speech_enabled = False
+    agent.model = TimedModel(agent.model)
+    return agent, model_path, load_seconds
+
+
+def run_item(agent, item, submit):
+    """Exécute une requête du corpus (via l'ordonnanceur si submit est fourni) et renvoie ses mesures."""
+    from llama_cpp_agent import ConversationSession
+
+    timings = {"first_token": None}
+    done = threading.Event()
+    outcome = {}
+
+    def on_token(token):
+        if timings["first_token"] is None:
+            timings["first_token"] = time.perf_counter()
+
+    def task():
+        outcome["started"] = time.perf_counter()
+        try:
+            if item["kind"] == "code":
+                outcome["text"] = agent.generate_code(item["prompt"], language=item.get("language", "Python"),
+                                                      use_cache=False)
+            else:
+                agent.session = ConversationSession()  # Chaque requête ouvre une conversation neuve
+                outcome["text"] = agent.generate(item["prompt"], on_token=on_token)
+        finally:
+            outcome["finished"] = time.perf_counter()
+            done.set()
+
+    agent.model.last = None
+    submitted = time.perf_counter()
+    if submit is None:
+        task()
+    elif not submit(task, job_class="llm"):
+        raise RuntimeError("File d'attente de l'ordonnanceur pleine")
+    done.wait()
+    # Mémoires #save écrites et indexées avant la requête suivante : prompts identiques d'une exécution à l'autre
+    agent.memory_writer.flush()
+
+    text = outcome.get("text", "")
+    record = agent.model.last or {}
+    if timings["first_token"] is None and record.get("first_token"):
+        timings["first_token"] = record["first_token"]  # generate_code : pas de rappel on_token
+    result = {
+        "id": item["id"],
+        "kind": item["kind"],
+        "ok": bool(text) and not text.startswith(("[ERREUR]", "[ANNULÉ]")),
+        "latency_s": outcome["finished"] - submitted,
+        "queue_s": outcome["started"] - submitted,
+        "ttft_s": timings["first_token"] - submitted if timings["first_token"] else None,
+        "prompt_tokens": record.get("prompt_tokens"),
+        "completion_tokens": record.get("completion_tokens"),
+        "prompt_eval_tok_s": None,
+        "decode_tok_s": None,
+        "throughput_tok_s": None,
+    }
+    if record.get("end"):
+        generation_s = record["end"] - record["start"]
+        if generation_s > 0:
+            result["throughput_tok_s"] = record["completion_tokens"] / generation_s
+        # Le premier fragment marque la fin de l'évaluation du prompt
+        # (préfixe déjà présent dans le cache KV compris : c'est le débit effectif vu par l'utilisateur)
+        if record.get("first_token"):
+            prompt_s = record["first_token"] - record["start"]
+            decode_s = record["end"] - record["first_token"]
+            if prompt_s > 0:
+                result["prompt_eval_tok_s"] = record["prompt_tokens"] / prompt_s
+            if decode_s > 0 and record["completion_tokens"] > 1:
+                result["decode_tok_s"] = (record["completion_tokens"] - 1) / decode_s
+    return result
+
+
+def summarize(runs):
+    summary = {}
+    for kind in sorted({run["kind"] for run in runs}):
+        kind_runs = [run for run in runs if run["kind"] == kind]
+        latencies = [run["latency_s"] for run in kind_runs]
+        ttfts = [run["ttft_s"] for run in kind_runs]
+        summary[kind] = {
+            "runs": len(kind_runs),
+            "errors": sum(1 for run in kind_runs if not run["ok"]),
+            "latency_p50_s": percentile(latencies, 50),
+            "latency_p95_s": percentile(latencies, 95),
+            "ttft_p50_s": percentile(ttfts, 50),
+            "ttft_p95_s": percentile(ttfts, 95),
+            "prompt_eval_tok_s": percentile([run["prompt_eval_tok_s"] for run in kind_runs], 50),
+            "decode_tok_s": percentile([run["decode_tok_s"] for run in kind_runs], 50),
+            "throughput_tok_s": percentile([run["throughput_tok_s"] for run in kind_runs], 50),
+            # Compteurs déterministes (identiques d'une machine à l'autre en mode stub)
+            "prompt_tokens": sum(run["prompt_tokens"] or 0 for run in kind_runs),
+            "completion_tokens": sum(run["completion_tokens"] or 0 for run in kind_runs),
+        }
+    return summary
+
+
+def is_gated(name, stub):
+    """Métriques pouvant signaler une régression. En mode stub, les durées dépendent de la machine :
+    seuls les compteurs déterministes sont comparés (les durées restent affichées)."""
+    if name.endswith(".errors"):
+        return True
+    if stub:
+        return name.endswith(".prompt_tokens")
+    return not name.endswith("tokens")
+
+
+def compare(results, baseline, tolerance, floor_ms=20.0, floor_mb=32.0, stub=False):
+    """Compare les métriques résumées ; renvoie les régressions [(métrique, référence, actuel, écart)].
+
+    Une durée (ou la mémoire) ne régresse que si l'écart dépasse à la fois la tolérance relative
+    et un plancher absolu (floor_ms, floor_mb) : le bruit sur des mesures de quelques ms est ignoré.
+    """
+    regressions = []
+    current_metrics = flatten(results)
+    print(f"\n{'métrique':<32}{'référence':>12}{'actuel':>12}{'écart':>10}")
+    for name, reference in flatten(baseline).items():
+        current = current_metrics.get(name)
+        if current is None:
+            continue
+        if name.endswith(".errors"):
+            worse = current > reference
+            print(f"{name:<32}{reference:>12}{current:>12}{'':>10}{' !' if worse else ''}")
+            if worse:
+                regressions.append((name, reference, current, None))
+            continue
+        if not reference:
+            continue
+        change = (current - reference) / reference
+        # Débits (tok/s) : plus haut = mieux ; durées, mémoire, tokens de prompt : plus bas = mieux
+        worse = -change if name.endswith("tok_s") else change
+        floor = floor_ms / 1000.0 if name.endswith("_s") and not name.endswith("tok_s") else (
+            floor_mb if name.endswith("_mb") else 0.0)
+        regressed = is_gated(name, stub) and worse > tolerance and abs(current - reference) > floor
+        flag = " !" if regressed else ("" if is_gated(name, stub) else "  (info)")
+        print(f"{name:<32}{reference:>12.4g}{current:>12.4g}{change:>+9.1%}{flag}")
+        if regressed:
+            regressions.append((name, reference, current, change))
+    return regressions
+
+
+def flatten(results):
+    metrics = {"peak_rss_mb": results["peak_rss_mb"]}
+    for kind, values in results["summary"].items():
+        for key, value in values.items():
+            if key != "runs" and value is not None:
+                metrics[f"{kind}.{key}"] = value
+    return metrics
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark d'inférence de LlamaCppAgent")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--stub", action="store_true", help="modèle de substitution déterministe (sans GGUF)")
+    source.add_argument("--model-path", help="fichier GGUF à mesurer")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--repeat", type=int, default=3, help="passes mesurées sur le corpus")
+    parser.add_argument("--warmup-runs", type=int, default=1, help="passes non mesurées avant la mesure")
+    parser.add_argument("--direct", action="store_true", help="appelle l'agent sans passer par l'ordonnanceur")
+    parser.add_argument("--no-warmup", action="store_true", help="désactive le préchauffage du modèle au chargement")
+    parser.add_argument("--stub-prompt-ms", type=float, default=0.2, help="coût simulé par token de prompt")
+    parser.add_argument("--stub-decode-ms", type=float, default=3.0, help="coût simulé par token généré")
+    parser.add_argument("--output", default="cache/benchmarks/results.json")
+    parser.add_argument("--baseline", help="référence à comparer (défaut : benchmarks/baselines/<mode>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre ces résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="écart relatif toléré avant régression")
+    parser.add_argument("--floor-ms", type=float, default=20.0, help="écart absolu minimal sur une durée")
+    parser.add_argument("--floor-mb", type=float, default=32.0, help="écart absolu minimal sur le pic de RSS")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mode = "stub" if args.stub else os.path.splitext(os.path.basename(args.model_path))[0]
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{mode}.json")
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    # Mémoires enregistrées (#save) dans une base SQLite jetable : la vraie mémoire d'Alice n'est pas touchée
+    from utils.database_handler import DatabaseHandler
+    work_dir = tempfile.mkdtemp(prefix="alice_bench_")
+    storage = DatabaseHandler(db_file=os.path.join(work_dir, "bench.db"))
+
+    agent, model_path, load_seconds = create_agent(args, storage)
+    resource_manager = None
+    submit = None
+    if not args.direct:
+        from gestionnaire_ressources.resource_manager import IAResourceManager
+        # Même chemin que l'interface : contrôle d'admission puis file "llm"
+        resource_manager = IAResourceManager(agent=agent, max_threads=1, max_memory_gb=0.0)
+        submit = resource_manager.submit
+
+    try:
+        for _ in range(args.warmup_runs):
+            for item in corpus:
+                run_item(agent, item, submit)
+
+        runs = []
+        for iteration in range(args.repeat):
+            for item in corpus:
+                run = run_item(agent, item, submit)
+                run["iteration"] = iteration
+                runs.append(run)
+                print(f"[BENCH] {item['id']:<20} {run['latency_s'] * 1000:8.1f} ms"
+                      f"{'' if run['ok'] else '  (échec)'}")
+    finally:
+        agent.shutdown()
+        storage.close()
+        if resource_manager is not None:
+            resource_manager.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "mode": mode,
+            "model_path": model_path,
+            "corpus": os.path.basename(args.corpus),
+            "repeat": args.repeat,
+            "via_scheduler": not args.direct,
+            "warmup": not args.no_warmup,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "load_s": load_seconds,
+        "peak_rss_mb": peak_rss_bytes() / (1024 ** 2),
+        "summary": summarize(runs),
+        "runs": runs,
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4, ensure_ascii=False)
+    print(f"[BENCH] Résultats écrits dans {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({key: results[key] for key in ("meta", "peak_rss_mb", "summary")}, f, indent=4, ensure_ascii=False)
+        print(f"[BENCH] Référence enregistrée : {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"[BENCH] Pas de référence ({baseline_path}) : relancer avec --save-baseline pour en créer une.")
+        return 0
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.floor_ms, args.floor_mb, stub=args.stub)
+    if regressions:
+        print(f"[BENCH] {len(regressions)} régression(s) au-delà de {args.tolerance:.0%}")
+        return 1
+    print("[BENCH] Aucune régression.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
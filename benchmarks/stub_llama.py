@@ -0,0 +1,124 @@
+import random
+import re
+import time
+import zlib
+
+
+CHAT_WORDS = [
+    "je", "pense", "que", "la", "réponse", "dépend", "du", "contexte", "et", "des", "données",
+    "disponibles", "il", "faut", "vérifier", "chaque", "étape", "avec", "soin", "pour", "obtenir",
+    "un", "résultat", "fiable", "dans", "ce", "cas", "le", "plus", "simple", "est", "de", "commencer",
+    "par", "une", "petite", "expérience", "puis", "ajuster", "selon", "les", "mesures",
+]
+
+CODE_LINES = [
+    "def traiter(valeurs):",
+    "    resultat = []",
+    "    for valeur in valeurs:",
+    "        if valeur is None:",
+    "            continue",
+    "        resultat.append(valeur * 2)",
+    "    return resultat",
+    "",
+    "print(traiter([1, 2, 3]))",
+]
+
+
+class StubState:
+    """État KV simulé (sérialisable par pickle comme un LlamaState)."""
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+
+
+class StubLlama:
+    """Remplaçant déterministe de llama_cpp.Llama pour les benchmarks sans fichier GGUF.
+
+    Même interface que celle utilisée par LlamaCppAgent (tokenize, eval, reset, save_state,
+    load_state, n_ctx, create_completion en flux ou non). Le coût est simulé : prompt_eval_ms par
+    token de prompt réellement évalué (le préfixe commun avec le cache KV est réutilisé, comme
+    llama.cpp) et decode_ms par token généré. Une même requête donne toujours le même texte.
+    """
+
+    def __init__(self, model_path, n_ctx=2048, seed=42, prompt_eval_ms=0.2, decode_ms=3.0, **params):
+        self.model_path = model_path
+        self.context_size = n_ctx
+        self.seed = seed
+        self.prompt_eval_s = prompt_eval_ms / 1000.0
+        self.decode_s = decode_ms / 1000.0
+        self.tokens = []  # Contenu simulé du cache KV
+
+    def n_ctx(self):
+        return self.context_size
+
+    def tokenize(self, text, add_bos=True, special=False):
+        pieces = re.findall(rb"\w+|[^\w\s]|\s+", text)
+        return ([1] if add_bos else []) + [zlib.crc32(piece) % 32000 + 2 for piece in pieces]
+
+    def reset(self):
+        self.tokens = []
+
+    def eval(self, tokens):
+        time.sleep(len(tokens) * self.prompt_eval_s)
+        self.tokens.extend(tokens)
+
+    def save_state(self):
+        return StubState(self.tokens)
+
+    def load_state(self, state):
+        self.tokens = list(state.tokens)
+
+    def close(self):
+        self.tokens = []
+
+    def _pieces(self, prompt, max_tokens):
+        rng = random.Random(self.seed ^ zlib.crc32(prompt.encode("utf-8")))
+        if "```" in prompt[-40:]:  # Prompt de code : se termine par l'ouverture du bloc
+            lines = CODE_LINES[:rng.randint(4, len(CODE_LINES))]
+            pieces = [piece for line in lines for piece in re.findall(r"\s+|\w+|[^\w\s]", line) + ["\n"]]
+            pieces.append("```")
+        else:
+            pieces = [" " + rng.choice(CHAT_WORDS) for _ in range(rng.randint(12, 48))] + [".", "\n"]
+        return pieces[:max_tokens]
+
+    def _generate(self, prompt, max_tokens, stop, stopping_criteria):
+        prompt_tokens = self.tokenize(prompt.encode("utf-8"))
+        common = 0
+        for cached, new in zip(self.tokens, prompt_tokens):
+            if cached != new:
+                break
+            common += 1
+        self.tokens = self.tokens[:common]
+        self.eval(prompt_tokens[common:])
+
+        text = ""
+        for piece in self._pieces(prompt, max_tokens):
+            time.sleep(self.decode_s)
+            self.tokens.append(zlib.crc32(piece.encode("utf-8")) % 32000 + 2)
+            candidate = text + piece
+            # Comme llama.cpp : la séquence d'arrêt termine la génération sans être renvoyée
+            hits = [candidate.find(s) for s in stop if s in candidate]
+            if hits:
+                if min(hits) > len(text):
+                    yield candidate[len(text):min(hits)]
+                return
+            text = candidate
+            yield piece
+            if any(criterion(self.tokens, None) for criterion in stopping_criteria):
+                return
+
+    def create_completion(self, prompt, max_tokens=16, stop=None, stopping_criteria=None, stream=False, **sampling):
+        if isinstance(stop, str):
+            stop = [stop]
+        pieces = self._generate(prompt, max_tokens, stop or [], stopping_criteria or [])
+        if stream:
+            return ({"choices": [{"text": piece, "index": 0, "finish_reason": None}]} for piece in pieces)
+
+        completion = list(pieces)
+        return {
+            "choices": [{"text": "".join(completion), "index": 0, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(self.tokenize(prompt.encode("utf-8"))),
+                "completion_tokens": len(completion),
+            },
+        }
@@ -3,15 +3,10 @@ import os
 import json
 import time
 import re
-import psutil
 import pyperclip
 from html import escape
 
 # --- Third-party libraries ---
-import speech_recognition as sr
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters import HtmlFormatter
 from gestionnaire_ressources.resource_manager import IAResourceManager
 
 # --- PyQt5 ---
@@ -28,8 +23,7 @@ from PyQt5.QtGui import QPixmap, QTextCursor, QPalette, QColor, QFont, QMovie
 from utils.utils import RunnableFunc, StyledLabel
 
 # --- Projet ---
-from llama_cpp_agent import LlamaCppAgent  # utilisé pour self.agent
-# from diffusers import StableDiffusionPipeline  # si inutilisé ici, peut être commenté
+# Pygments n'est importé qu'à la première coloration de code (thread de génération)
 
 # --- Qt meta-type registration (facultatif) ---
 try:
@@ -59,16 +53,14 @@ class codeManager(QObject):
         print("[DEBUG] >>> Appel de generate_code_from_text() avec :", text)
 
         # Message d'attente affiché dans l'interface
-        self.parent.scroll_layout.addWidget(
-            StyledLabel("<b style='color: lightgreen'>[Alice]</b> Je génère un code... ⌨️")
-        )
+        self.parent.transcript.add_text("<b style='color: lightgreen'>[Alice]</b> Je génère un code... ⌨️")
         QApplication.processEvents()
 
-        if not self.resource_manager.ressources_disponibles():
-            print("[INFO] Requête refusée: surcharge CPU ou RAM")
-            return "Les ressources système sont surchargées. Veuillez réessayer plus tard."
-
         def run():
+            from pygments import highlight
+            from pygments.lexers import get_lexer_by_name
+            from pygments.formatters import HtmlFormatter
+
             print("[DEBUG] → Début du thread de génération de code")
             language = self.parent.language_selector.currentText()
             code_response = self.agent.generate_code(text, language=language)
@@ -87,11 +79,6 @@ class codeManager(QObject):
             formatter = HtmlFormatter(style="monokai", noclasses=True)
             highlighted = highlight(extracted_code, lexer, formatter)
 
-            # Arrêt message attente et spinner
-            self.parent.clear_waiting_message()
-            self.parent.spinner_movie.stop()
-            self.parent.spinner_label.setVisible(False)
-
             # Mise à jour de l'interface (Qt thread-safe)
             QMetaObject.invokeMethod(
                 self,
@@ -102,72 +89,32 @@ class codeManager(QObject):
             )
 
         # Scroll vers le bas léger pour lisibilité
-        QTimer.singleShot(100, lambda: self.parent.scroll_area.verticalScrollBar().setValue(
-            self.parent.scroll_area.verticalScrollBar().maximum()))
+        QTimer.singleShot(100, self.parent.transcript_view.scrollToBottom)
 
-        # Lancement thread via QRunnable
-        QThreadPool.globalInstance().start(RunnableFunc(run))
+        # Même file que les réponses texte : une seule génération LLM à la fois
+        job_id = self.resource_manager.submit(run, job_class="llm")
+        if not job_id:
+            self.parent.clear_waiting_message()
+            self.parent.transcript.add_text("<span style='color:red'>[!] Trop de demandes en attente, réessayez dans un instant.</span>")
+        elif self.parent.model_loader.loading:
+            self.parent.set_waiting_message("Modèle en cours de chargement, votre demande partira dès qu'il sera prêt...")
+        elif self.resource_manager.scheduler.position(job_id) > 1:
+            self.parent.set_waiting_message(f"En file d'attente (position {self.resource_manager.scheduler.position(job_id)})...")
 
 
     @pyqtSlot(str, str)
     def append_code_block(self, highlighted_code, raw_code):
-        title = StyledLabel("<b style='color: lightgreen'>[Alice]</b> Voici le code généré :")
-        self.parent.scroll_layout.addWidget(title)
-
-        container = QWidget()
-        container_layout = QVBoxLayout(container)
-        container_layout.setContentsMargins(0, 0, 0, 0)
-        container_layout.setSpacing(2)
-        container.setStyleSheet(
-            "background-color: #1e1e1e; border-radius: 4px; padding: 0; margin: 0;"
-        )
-
-        code_display = QTextEdit()
-        code_display.setReadOnly(True)
-        code_display.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        code_display.setStyleSheet("""
-            background-color: #1e1e1e;
-            color: white;
-            border: none;
-            padding: 4px;
-            margin: 0;
-            font-family: Consolas, monospace;
-            font-size: 13px;
-            line-height: 1.2em;
-        """)
-        code_display.setMinimumHeight(50)
-        code_display.setMaximumHeight(200)
-        code_display.setMaximumWidth(450)
-        code_display.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        code_display.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-
-        # Nettoyage du HTML pour retirer <pre> inutiles
-        cleaned_html = re.sub(r"</?pre[^>]*>", "", highlighted_code, flags=re.IGNORECASE)
-        code_display.setHtml(f"<div style='line-height: 1.2em; font-family: Consolas, monospace;'>{cleaned_html}</div>")
-
-        container_layout.addWidget(code_display)
-
-        copy_btn = QPushButton("📋 Copier le code")
-        copy_btn.setFixedWidth(160)
-        copy_btn.clicked.connect(lambda: pyperclip.copy(raw_code))
-        copy_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #3a3a3a;
-                color: white;
-                border-radius: 6px;
-                padding: 6px;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-        """)
-
-        container_layout.addWidget(copy_btn, alignment=Qt.AlignRight)
-        self.parent.save_button.setEnabled(True)
+        # Arrêt message attente et spinner
+        self.parent.clear_waiting_message()
+        self.parent.spinner_movie.stop()
+        self.parent.spinner_label.setVisible(False)
 
-        self.parent.scroll_layout.addWidget(container)
-        QTimer.singleShot(100, lambda: self.parent.scroll_area.verticalScrollBar().setValue(
-            self.parent.scroll_area.verticalScrollBar().maximum()))
+        self.parent.transcript.add_text("<b style='color: lightgreen'>[Alice]</b> Voici le code généré :")
+
+        # Bloc dessiné par le délégué du transcript ; copie par double-clic ou menu contextuel
+        self.parent.transcript.add_code(highlighted_code, raw_code)
+        self.parent.save_button.setEnabled(True)
+        QTimer.singleShot(100, self.parent.transcript_view.scrollToBottom)
 
         # ✅ Stockage du dernier prompt / réponse pour bouton sauvegarder
         self.parent.last_response = raw_code
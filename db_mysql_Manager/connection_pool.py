@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
+
+DEFAULT_DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "JOJOJOJO88",
+    "database": "ia_alice"
+}
+
+
+def load_db_config(config_path="config.json"):
+    """Paramètres de connexion : valeurs par défaut, surchargées par la section "mysql" de config.json."""
+    config = dict(DEFAULT_DB_CONFIG)
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r") as f:
+                config.update(json.load(f).get("mysql", {}))
+        except (OSError, ValueError) as e:
+            print(f"[MySQL] config.json illisible, paramètres par défaut utilisés : {e}")
+    return config
+
+
+class MySQLConnectionPool:
+    """Pool de connexions MySQL partagé par tout le processus (thread-safe).
+
+    Chaque opération emprunte sa propre connexion : plus de curseur partagé entre threads.
+    Les connexions sont vérifiées (ping + reconnexion) avant d'être prêtées ; si le serveur
+    était injoignable, le pool est recréé à la demande suivante.
+    """
+
+    _instance = None  # Singleton
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(MySQLConnectionPool, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, pool_size=5, acquire_timeout=5.0, **db_config):
+        if self._initialized:
+            return
+
+        self.db_config = db_config or load_db_config()
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self.pool = None
+        self.lock = threading.Lock()
+        self._initialized = True
+
+    def _ensure_pool(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name="alice_pool",
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    **self.db_config
+                )
+                print(f"[MySQL] Pool de {self.pool_size} connexions prêt.")
+            return self.pool
+
+    def _get_connection(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                return self._ensure_pool().get_connection()
+            except PoolError:
+                # Toutes les connexions sont prêtées : on attend qu'une se libère
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    @contextmanager
+    def connection(self):
+        conn = self._get_connection()
+        try:
+            # Contrôle de santé : reconnecte une connexion coupée (timeout serveur, redémarrage)
+            conn.ping(reconnect=True, attempts=3, delay=0.5)
+            yield conn
+        finally:
+            conn.close()  # Retour au pool
+
+    def is_available(self):
+        try:
+            with self.connection():
+                return True
+        except Error as e:
+            print(f"[MySQL] Serveur indisponible : {e}")
+            with self.lock:
+                self.pool = None
+            return False
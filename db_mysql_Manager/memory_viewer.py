@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (
     QHBoxLayout, QMessageBox, QFrame
 )
 from PyQt5.QtCore import Qt
-from db.mysql_manager import MySQLManager
+from utils.storage import create_storage
 
 
 class MemoryViewer(QWidget):
@@ -12,12 +12,7 @@ class MemoryViewer(QWidget):
         self.setWindowTitle("Mémoire d'Alice")
         self.setGeometry(150, 150, 700, 500)
 
-        self.db_manager = MySQLManager(
-            host="localhost",
-            user="root",
-            password="JOJOJOJO88",
-            database="ia_alice"
-        )
+        self.db_manager = create_storage()
 
         self.layout = QVBoxLayout(self)
 
@@ -41,7 +36,7 @@ class MemoryViewer(QWidget):
                 item.setParent(None)
 
         try:
-            memories = self.db_manager.fetch_all_memories()
+            memories = self.db_manager.fetch_memory_page(limit=200)
             if not memories:
                 label = QLabel("Aucune mémoire enregistrée.")
                 label.setStyleSheet("color: gray;")
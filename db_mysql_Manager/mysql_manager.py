@@ -1,64 +1,156 @@
-import mysql.connector
 from mysql.connector import Error
 
-class MySQLManager:
-    def __init__(self, host="localhost", user="root", password="JOJOJOJO88", database="ia_alice"):
-        try:
-            self.conn = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database
-            )
-            self.cursor = self.conn.cursor()
-            print("[MySQL] Connexion réussie.")
-        except Error as e:
-            self.conn = None
-            self.cursor = None
-            print(f"[MySQL] Erreur de connexion : {e}")
+from db_mysql_Manager.connection_pool import MySQLConnectionPool, load_db_config
+from utils.storage import MemoryStorage
+
+
+class MySQLManager(MemoryStorage):
+    """Accès à la table memory. Chaque opération emprunte une connexion au pool partagé
+    et utilise son propre curseur : l'objet peut être utilisé depuis plusieurs threads."""
+
+    fulltext_ready = False  # Index FULLTEXT vérifié/créé une seule fois par processus
+
+    def __init__(self, host=None, user=None, password=None, database=None):
+        # Les paramètres explicites ne servent qu'à la création du pool (premier appel)
+        db_config = {key: value for key, value in
+                     dict(host=host, user=user, password=password, database=database).items()
+                     if value is not None}
+        if db_config:
+            db_config = dict(load_db_config(), **db_config)
+        self.pool = MySQLConnectionPool(**db_config)
+
+    def _execute(self, query, params=(), fetch=None, commit=False):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                if commit:
+                    conn.commit()
+                if fetch == "all":
+                    return cursor.fetchall()
+                if fetch == "one":
+                    return cursor.fetchone()
+                return cursor.lastrowid
+            finally:
+                cursor.close()
 
     def save_memory(self, prompt: str, response: str):
         try:
             query = "INSERT INTO memory (prompt, response) VALUES (%s, %s)"
-            self.cursor.execute(query, (prompt, response))
-            self.conn.commit()
+            memory_id = self._execute(query, (prompt, response), commit=True)
             print("[MySQL] Mémoire sauvegardée.")
+            return memory_id
         except Exception as e:
             print(f"[ERREUR] [MÉMOIRE] Échec de la sauvegarde en base de données : {str(e)}")
+            return None
+
+    def save_memory_batch(self, rows):
+        """Insère [(prompt, response), ...] en un seul INSERT multi-lignes et un commit.
+        Renvoie les ids attribués ; lève l'exception en cas d'échec (l'appelant garde le lot)."""
+        if not rows:
+            return []
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany("INSERT INTO memory (prompt, response) VALUES (%s, %s)", list(rows))
+                conn.commit()
+                # Un INSERT multi-lignes reçoit des id auto-incrémentés consécutifs à partir du premier
+                first_id = cursor.lastrowid
+            finally:
+                cursor.close()
+        return [first_id + i if first_id else None for i in range(len(rows))]
 
     def fetch_memory(self, limit=100):
-        if not self.conn or not self.cursor:
-            print("[MySQL] Connexion MySQL non établie.")
+        try:
+            return self._execute("SELECT prompt, response FROM memory ORDER BY id DESC LIMIT %s", (limit,), fetch="all")  # Nom de la table "memory"
+        except Error as e:
+            print(f"[MySQL] Erreur de lecture : {e}")
+            return []
+
+    def fetch_memory_batch(self, after_id=0, limit=1000):
+        """Lit les mémoires par lots croissants d'id (construction de l'index sémantique)."""
+        try:
+            return self._execute(
+                "SELECT id, prompt, response FROM memory WHERE id > %s ORDER BY id LIMIT %s",
+                (after_id, limit), fetch="all"
+            )
+        except Error as e:
+            print(f"[MySQL] Erreur de lecture : {e}")
             return []
 
+    def ensure_fulltext_index(self):
+        """Crée l'index FULLTEXT (prompt, response) utilisé par la recherche s'il n'existe pas encore.
+        Peut être long (ALTER TABLE sur une grosse table) : à appeler hors du thread GUI."""
+        if MySQLManager.fulltext_ready:
+            return True
+        try:
+            count = self._execute(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'memory' AND index_type = 'FULLTEXT'",
+                fetch="one"
+            )[0]
+            if count == 0:
+                self._execute("ALTER TABLE memory ADD FULLTEXT INDEX ft_memory (prompt, response)", commit=True)
+                print("[MySQL] Index FULLTEXT créé sur memory(prompt, response).")
+            MySQLManager.fulltext_ready = True
+            return True
+        except Error as e:
+            print(f"[MySQL] Index FULLTEXT indisponible : {e}")
+            return False
+
+    @staticmethod
+    def to_boolean_query(search: str) -> str:
+        # "trier liste" -> "+trier* +liste*" : tous les mots, préfixes acceptés
+        words = [w for w in search.replace('"', " ").split() if w.strip("+-<>()~*")]
+        return " ".join(f"+{w.strip('+-<>()~*')}*" for w in words)
+
+    def fetch_memory_page(self, before_id=None, limit=50, search=None):
+        """Page de mémoires (id décroissant) par pagination sur clé : WHERE id < dernier id vu."""
+        conditions = []
+        params = []
+        if before_id is not None:
+            conditions.append("id < %s")
+            params.append(before_id)
+        if search and self.to_boolean_query(search):
+            conditions.append("MATCH(prompt, response) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(self.to_boolean_query(search))
+
+        query = "SELECT id, prompt, response FROM memory"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT %s"
+        params.append(limit)
+
         try:
-            self.cursor.execute("SELECT prompt, response FROM memory ORDER BY id DESC LIMIT %s", (limit,))  # Nom de la table "memory"
-            return self.cursor.fetchall()
+            return self._execute(query, tuple(params), fetch="all")
         except Error as e:
             print(f"[MySQL] Erreur de lecture : {e}")
             return []
 
+    def delete_all_memories(self):
+        try:
+            self._execute("DELETE FROM memory", commit=True)
+            print("[BDD] Toutes les mémoires ont été supprimées.")
+        except Exception as e:
+            print(f"[ERREUR] Suppression totale des mémoires : {e}")
+
     def fetch_last_memories(self, limit=5):
         try:
             query = "SELECT prompt, response FROM memory ORDER BY created_at DESC LIMIT %s"  # Nom de la table "memory"
-            self.cursor.execute(query, (limit,))
-            return self.cursor.fetchall()
+            return self._execute(query, (limit,), fetch="all")
         except Exception as e:
             print(f"[ERREUR] [MÉMOIRE] Échec de la récupération des mémoires : {str(e)}")
             return []
 
     def close(self):
-        if self.conn and self.conn.is_connected():
-            self.cursor.close()
-            self.conn.close()
-            print("[MySQL] Connexion fermée.")
+        # Les connexions appartiennent au pool partagé : rien à fermer ici
+        pass
 
     def delete_memory_by_id(self, memory_id: int):
         """Supprime une entrée mémoire spécifique par son ID."""
         try:
             query = "DELETE FROM memory WHERE id = %s"  # Nom de la table "memory"
-            self.cursor.execute(query, (memory_id,))
-            self.conn.commit()
+            self._execute(query, (memory_id,), commit=True)
             print(f"[BDD] Mémoire ID {memory_id} supprimée.")
         except Exception as e:
             print(f"[ERREUR] Suppression mémoire ID {memory_id} : {e}")
@@ -0,0 +1,171 @@
+import json
+import os
+import queue
+import threading
+import time
+
+
+class MemoryWriteBehind:
+    """File d'écriture différée des mémoires.
+
+    save() rend la main immédiatement ; un thread regroupe les insertions en lots
+    (un seul executemany + commit par lot), vidés dès batch_size éléments ou après flush_interval secondes.
+    Si la base est injoignable, le lot est ajouté à un journal JSONL local, rejoué plus tard.
+    """
+
+    def __init__(self, db_manager, batch_size=32, flush_interval=2.0,
+                 journal_path="cache/memory_journal.jsonl", retry_interval=30.0, on_saved=None):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.journal_path = journal_path
+        self.retry_interval = retry_interval
+        self.on_saved = on_saved  # Appelé avec [(id, prompt, response), ...] après chaque lot écrit
+        self.queue = queue.Queue()
+        self.journal_lock = threading.Lock()
+        self.last_replay = 0.0
+        self.stopped = False
+
+        os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+        self.thread.start()
+
+    def save(self, prompt, response):
+        if self.stopped:
+            raise RuntimeError("File d'écriture des mémoires fermée.")
+        self.queue.put((prompt, response))
+
+    def pending_count(self):
+        return self.queue.qsize()
+
+    def flush(self, timeout=10.0):
+        """Attend que les mémoires déjà confiées soient écrites (ou mises au journal) ; False si délai dépassé."""
+        if self.stopped:
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Vide la file (ou la verse dans le journal) puis arrête le thread."""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        self._replay_journal()
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not batch and self._journal_exists():
+                timeout = self.retry_interval if timeout is None else min(timeout, self.retry_interval)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is None:  # Arrêt : dernier vidage
+                self._release(self._drain(batch), batch)
+                return
+            if isinstance(item, threading.Event):  # flush() : vidage immédiat puis réveil de l'appelant
+                self._release([item] + self._drain(batch), batch)
+                batch = []
+                deadline = None
+                continue
+            if item:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._release(self._drain(batch), batch)
+                batch = []
+                deadline = None
+            elif not batch and time.monotonic() - self.last_replay >= self.retry_interval:
+                self._replay_journal()
+
+    def _drain(self, batch):
+        # Récupère ce qui est déjà en file pour profiter du même aller-retour ; renvoie les flush() en attente
+        waiters = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return waiters
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+
+    def _release(self, waiters, batch):
+        self._flush(batch)
+        for waiter in waiters:
+            waiter.set()
+
+    def _write(self, rows):
+        ids = self.db_manager.save_memory_batch(rows)
+        print(f"[MÉMOIRE] Lot de {len(rows)} mémoire(s) sauvegardé.")
+        if self.on_saved:
+            try:
+                self.on_saved([(memory_id, prompt, response) for memory_id, (prompt, response) in zip(ids, rows)])
+            except Exception as e:
+                print(f"[MÉMOIRE] Rappel après sauvegarde en échec : {e}")
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        if self._journal_exists():
+            # Conserver l'ordre : le journal passe avant les nouvelles mémoires
+            self._spill(batch)
+            self._replay_journal()
+            return
+        try:
+            self._write(batch)
+        except Exception as e:
+            print(f"[MÉMOIRE] Base injoignable, {len(batch)} mémoire(s) mises au journal : {e}")
+            self._spill(batch)
+
+    def _journal_exists(self):
+        return os.path.exists(self.journal_path)
+
+    def _spill(self, rows):
+        with self.journal_lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                for prompt, response in rows:
+                    f.write(json.dumps({"prompt": prompt, "response": response}, ensure_ascii=False) + "\n")
+
+    def _replay_journal(self):
+        self.last_replay = time.monotonic()
+        with self.journal_lock:
+            if not self._journal_exists():
+                return
+            rows = []
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        rows.append((entry["prompt"], entry["response"]))
+                    except (ValueError, KeyError):
+                        continue  # Ligne tronquée (arrêt brutal pendant l'écriture)
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    self._write(rows[start:start + self.batch_size])
+                    done = start + self.batch_size
+                    if done < len(rows):
+                        # Réécrit le reste pour ne jamais insérer deux fois un lot déjà commité
+                        self._rewrite_journal(rows[done:])
+            except Exception as e:
+                print(f"[MÉMOIRE] Rejeu du journal reporté : {e}")
+                return
+            os.remove(self.journal_path)
+            print(f"[MÉMOIRE] Journal rejoué : {len(rows)} mémoire(s).")
+
+    def _rewrite_journal(self, rows):
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for prompt, response in rows:
+                f.write(json.dumps({"prompt": prompt, "response": response}, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.journal_path)
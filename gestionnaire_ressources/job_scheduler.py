@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ScheduledJob:
+    def __init__(self, job_id, job_class, fn, args, kwargs, priority=0):
+        self.job_id = job_id
+        self.job_class = job_class
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.submitted_at = time.monotonic()
+        self.waiting_notified = False
+
+
+class JobScheduler(QObject):
+    """Ordonnanceur unique des tâches lourdes (LLM, code, images).
+
+    Chaque classe de tâche a sa limite de concurrence (par défaut une génération LLM et une
+    génération d'image à la fois). Les tâches en trop attendent dans une file à priorités bornée
+    au lieu d'être refusées ; elles démarrent dès qu'une place se libère et que le contrôle
+    d'admission (ressources système) le permet.
+    """
+
+    job_queued = pyqtSignal(int, str, int)    # job_id, classe, position dans la file de la classe
+    job_started = pyqtSignal(int, str)        # job_id, classe
+    job_finished = pyqtSignal(int, str)       # job_id, classe
+    job_waiting = pyqtSignal(str)             # message : tâche retenue faute de ressources
+
+    DEFAULT_LIMITS = {"llm": 1, "image": 1}
+
+    _instance = None  # Singleton
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(JobScheduler, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, limits=None, max_pending=32, max_running=None, admission_check=None,
+                 max_admission_wait=10.0, poll_interval=0.5):
+        if self._initialized:
+            return
+        super().__init__()
+
+        self.limits = dict(self.DEFAULT_LIMITS, **(limits or {}))
+        self.max_pending = max_pending
+        self.max_running = max_running          # Plafond global, toutes classes confondues
+        self.admission_check = admission_check  # callable(job_class) -> bool, doit être instantané
+        self.max_admission_wait = max_admission_wait
+        self.poll_interval = poll_interval
+
+        self.queues = {}    # classe -> tas [(-priorité, ordre, job)]
+        self.running = {}   # classe -> nombre de tâches en cours
+        self.pending = {}   # job_id -> job en attente
+        self.counter = itertools.count()
+        self.ids = itertools.count(1)
+        self.condition = threading.Condition()
+        self.active = True
+
+        self.dispatcher = threading.Thread(target=self._dispatch, name="job-scheduler", daemon=True)
+        self.dispatcher.start()
+        self._initialized = True
+
+    def set_limit(self, job_class, limit):
+        with self.condition:
+            self.limits[job_class] = limit
+            self.condition.notify_all()
+
+    def set_admission_check(self, admission_check):
+        with self.condition:
+            self.admission_check = admission_check
+            self.condition.notify_all()
+
+    def submit(self, job_class, fn, *args, priority=0, **kwargs):
+        """Met la tâche en file ; renvoie son id, ou None si la file est pleine (à l'appelant de réessayer)."""
+        with self.condition:
+            if not self.active or len(self.pending) >= self.max_pending:
+                print(f"[SCHEDULER] File pleine ({self.max_pending}), tâche {job_class} refusée.")
+                return None
+            job = ScheduledJob(next(self.ids), job_class, fn, args, kwargs, priority)
+            heapq.heappush(self.queues.setdefault(job_class, []), (-priority, next(self.counter), job))
+            self.pending[job.job_id] = job
+            position = self._position(job)
+            self.condition.notify_all()
+        print(f"[SCHEDULER] Tâche {job_class} #{job.job_id} en file (position {position})")
+        self.job_queued.emit(job.job_id, job_class, position)
+        return job.job_id
+
+    def cancel(self, job_id):
+        """Retire une tâche encore en attente ; une tâche démarrée gère sa propre annulation."""
+        with self.condition:
+            job = self.pending.pop(job_id, None)
+            if job is None:
+                return False
+            queue = self.queues[job.job_class]
+            queue[:] = [entry for entry in queue if entry[2] is not job]
+            heapq.heapify(queue)
+            return True
+
+    def position(self, job_id):
+        """Rang (1 = prochaine) d'une tâche dans la file de sa classe, 0 si elle n'attend plus."""
+        with self.condition:
+            job = self.pending.get(job_id)
+            return self._position(job) if job is not None else 0
+
+    def pending_count(self, job_class=None):
+        with self.condition:
+            if job_class is None:
+                return len(self.pending)
+            return len(self.queues.get(job_class, []))
+
+    def running_count(self, job_class=None):
+        with self.condition:
+            if job_class is None:
+                return sum(self.running.values())
+            return self.running.get(job_class, 0)
+
+    def shutdown(self):
+        with self.condition:
+            self.active = False
+            self.pending.clear()
+            self.queues.clear()
+            self.condition.notify_all()
+
+    def _position(self, job):
+        ordered = sorted(self.queues.get(job.job_class, []), key=lambda entry: entry[:2])
+        for index, entry in enumerate(ordered):
+            if entry[2] is job:
+                return index + 1
+        return 0
+
+    def _admissible(self, job):
+        if self.admission_check is None or self.admission_check(job.job_class):
+            return True
+        # Rien ne tourne : attendre ne libérera rien chez nous, on démarre après un délai
+        if sum(self.running.values()) == 0 and time.monotonic() - job.submitted_at >= self.max_admission_wait:
+            print(f"[SCHEDULER] Ressources toujours basses, démarrage forcé de la tâche #{job.job_id}")
+            return True
+        if not job.waiting_notified:
+            job.waiting_notified = True
+            self.job_waiting.emit(f"Ressources saturées : tâche {job.job_class} #{job.job_id} en attente.")
+        return False
+
+    def _start_ready_jobs(self):
+        """Démarre ce qui peut l'être ; renvoie True si des tâches restent retenues par l'admission."""
+        blocked = False
+        for job_class, queue in self.queues.items():
+            while queue and self.running.get(job_class, 0) < self.limits.get(job_class, 1):
+                if self.max_running is not None and sum(self.running.values()) >= self.max_running:
+                    return False
+                job = queue[0][2]
+                if not self._admissible(job):
+                    blocked = True
+                    break
+                heapq.heappop(queue)
+                del self.pending[job.job_id]
+                self.running[job_class] = self.running.get(job_class, 0) + 1
+                threading.Thread(target=self._run, args=(job,), name=f"job-{job_class}-{job.job_id}", daemon=True).start()
+        return blocked
+
+    def _dispatch(self):
+        with self.condition:
+            while self.active:
+                blocked = self._start_ready_jobs()
+                # Retenue par les ressources : on revérifie périodiquement, sinon on attend un événement
+                self.condition.wait(self.poll_interval if blocked else None)
+
+    def _run(self, job):
+        self.job_started.emit(job.job_id, job.job_class)
+        try:
+            job.fn(*job.args, **job.kwargs)
+        except Exception as e:
+            print(f"[SCHEDULER] Tâche {job.job_class} #{job.job_id} en erreur : {e}")
+        finally:
+            with self.condition:
+                self.running[job.job_class] -= 1
+                self.condition.notify_all()
+            self.job_finished.emit(job.job_id, job.job_class)
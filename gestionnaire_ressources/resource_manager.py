@@ -1,16 +1,9 @@
-from PyQt5.QtCore import QObject, pyqtSignal, QThreadPool, QRunnable, QMetaObject, Qt, pyqtSlot, Q_ARG
+from PyQt5.QtCore import QObject, pyqtSignal
 import psutil
 import threading
 
-class IARunnable(QRunnable):
-    def __init__(self, fn, *args, **kwargs):
-        super().__init__()
-        self.fn = fn
-        self.args = args
-        self.kwargs = kwargs
-
-    def run(self):
-        self.fn(*self.args, **self.kwargs)
+from gestionnaire_ressources.job_scheduler import JobScheduler
+from gestionnaire_ressources.resource_sampler import ResourceSampler
 
 class IAResourceManager(QObject):
     overload_signal = pyqtSignal(str)
@@ -35,69 +28,50 @@ class IAResourceManager(QObject):
         self.max_memory_gb = max_memory_gb if max_memory_gb is not None else total_ram_gb * max_memory_ratio
         self.max_memory_bytes = self.max_memory_gb * (1024 ** 3)
 
-        self.thread_pool = QThreadPool()
-        self.thread_pool.setMaxThreadCount(self.max_threads)
         self.mutex = threading.Lock()
 
-        print(f"[INFO] IAResourceManager initialisé avec seuil RAM disponible minimal de {self.max_memory_gb:.2f} GB (total RAM={total_ram_gb:.2f} GB)")
+        # Mesures prises en arrière-plan : les contrôles d'admission ne bloquent plus l'appelant
+        self.sampler = ResourceSampler()
+        self.sampler.start()
 
-        self._initialized = True
+        # Ordonnanceur unique : les tâches attendent leur tour au lieu d'être refusées
+        self.scheduler = JobScheduler(max_running=self.max_threads, admission_check=self.has_headroom)
+        self.scheduler.job_waiting.connect(self.overload_signal)
+        # Une tâche qui démarre lève l'alerte (ready_signal n'était émis que par l'ancien can_run)
+        self.scheduler.job_started.connect(lambda job_id, job_class: self.ready_signal.emit())
 
-    @pyqtSlot(str)
-    def emit_overload_signal(self, message):
-        self.overload_signal.emit(message)
-
-    @pyqtSlot()
-    def emit_ready_signal(self):
-        self.ready_signal.emit()
+        print(f"[INFO] IAResourceManager initialisé avec seuil RAM disponible minimal de {self.max_memory_gb:.2f} GB (total RAM={total_ram_gb:.2f} GB)")
 
-    def can_run(self):
-        cpu_usage = psutil.cpu_percent(interval=0.1)
-        ram_available = psutil.virtual_memory().available
-        ram_available_gb = ram_available / (1024 ** 3)
+        self._initialized = True
 
+    def seuil_ram_bytes(self):
         marge_securite_gb = 0.5
-        seuil_effectif_gb = self.max_memory_gb + marge_securite_gb
-        seuil_effectif_bytes = seuil_effectif_gb * (1024 ** 3)
+        return (self.max_memory_gb + marge_securite_gb) * (1024 ** 3)
 
-        print(f"[DEBUG] can_run(): CPU={cpu_usage:.1f}%, RAM disponible={ram_available_gb:.2f}GB, seuil RAM={seuil_effectif_gb:.2f}GB")
+    def has_headroom(self, job_class=None):
+        """Contrôle d'admission silencieux de l'ordonnanceur (lecture des échantillons, sans signal).
 
-        if cpu_usage > 85 or ram_available < seuil_effectif_bytes:
-            message = f"Surcharge détectée : CPU={cpu_usage:.1f}%, RAM disponible={ram_available_gb:.2f}GB < seuil {seuil_effectif_gb:.2f}GB"
-            QMetaObject.invokeMethod(self, "emit_overload_signal", Qt.QueuedConnection, Q_ARG(str, message))
+        Le CPU n'est contrôlé que si une autre tâche (toutes classes confondues) tourne déjà : une
+        génération LLM et une diffusion ne démarrent pas ensemble sur des cœurs saturés. Quand rien
+        ne tourne, la moyenne sur 2 s ne reflète que la tâche qui vient de finir : on ne l'attend pas.
+        """
+        if self.sampler.latest().ram_available < self.seuil_ram_bytes():
             return False
-
-        QMetaObject.invokeMethod(self, "emit_ready_signal", Qt.QueuedConnection)
-        return True
-
-    def submit(self, fn, *args, **kwargs):
-        if not self.can_run():
-            print("[SUBMIT] Refusé par can_run() — ressources insuffisantes.")
+        if self.scheduler.running_count() == 0:
+            return True
+        return self.sampler.average(seconds=2.0).cpu_percent <= 85
+
+    def submit(self, fn, *args, job_class="llm", priority=0, **kwargs):
+        """Confie la tâche à l'ordonnanceur ; renvoie son id, ou False si la file d'attente est pleine."""
+        job_id = self.scheduler.submit(job_class, fn, *args, priority=priority, **kwargs)
+        if job_id is None:
+            print("[SUBMIT] Refusé — file d'attente pleine.")
             return False
-        print("[SUBMIT] Requête acceptée — exécution dans le thread pool.")
-        runnable = IARunnable(fn, *args, **kwargs)
-        self.thread_pool.start(runnable)
-        return True
+        return job_id
 
     def stop(self):
-        self.thread_pool.clear()
-        self.thread_pool.waitForDone()
-
-    def ressources_disponibles(self):
-        cpu = psutil.cpu_percent(interval=0.5)
-        ram_available = psutil.virtual_memory().available
-        ram_available_gb = ram_available / (1024 ** 3)
-
-        marge_securite_gb = 0.5
-        seuil_effectif_gb = self.max_memory_gb + marge_securite_gb
-        seuil_effectif_bytes = seuil_effectif_gb * (1024 ** 3)
-
-        if cpu > 85 or ram_available < seuil_effectif_bytes:
-            message = f"[ALERTE] CPU={cpu:.1f}%, RAM disponible={ram_available_gb:.2f}GB < seuil {seuil_effectif_gb:.2f}GB"
-            print(message)
-            QMetaObject.invokeMethod(self, "emit_overload_signal", Qt.QueuedConnection, Q_ARG(str, message))
-            return False
-        return True
+        self.scheduler.shutdown()
+        self.sampler.stop()
 
     def update_config(self, *, agent=None, max_threads=None, max_memory_gb=None, max_memory_ratio=None):
         if agent is not None:
@@ -106,7 +80,7 @@ class IAResourceManager(QObject):
 
         if max_threads is not None:
             self.max_threads = max_threads
-            self.thread_pool.setMaxThreadCount(max_threads)
+            self.scheduler.max_running = max_threads
             print(f"[CONFIG] max_threads mis à jour : {max_threads}")
 
         if max_memory_gb is not None:
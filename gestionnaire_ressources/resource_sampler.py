@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import psutil
+
+ResourceSample = namedtuple("ResourceSample", ["timestamp", "cpu_percent", "ram_available", "ram_percent", "process_rss"])
+
+
+class ResourceSampler:
+    """Échantillonne CPU, RAM disponible et RSS du processus dans un thread de fond.
+
+    Les lectures (latest, average, trend, history) ne bloquent jamais : elles lisent
+    un tampon circulaire des derniers échantillons.
+    """
+
+    _instance = None  # Singleton
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(ResourceSampler, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, interval=0.5, history_seconds=300):
+        if self._initialized:
+            return
+
+        self.interval = interval
+        self.samples = deque(maxlen=max(2, int(history_seconds / interval)))
+        self.lock = threading.Lock()
+        self.process = psutil.Process()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self._initialized = True
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        psutil.cpu_percent(interval=None)  # Amorce : la mesure suivante couvre l'intervalle écoulé
+        self._record(cpu=0.0)
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self.thread.start()
+        print(f"[RESSOURCES] Échantillonnage toutes les {self.interval:.1f}s démarré.")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(self.interval * 2)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self._record(cpu=psutil.cpu_percent(interval=None))
+            except Exception as e:
+                print(f"[RESSOURCES] Échantillon ignoré : {e}")
+
+    def _record(self, cpu):
+        mem = psutil.virtual_memory()
+        sample = ResourceSample(time.monotonic(), cpu, mem.available, mem.percent, self.process.memory_info().rss)
+        with self.lock:
+            self.samples.append(sample)
+
+    def sample_now(self):
+        """Mesure RAM immédiate (après un changement brusque, ex. chargement d'un modèle) ; le CPU reprend la dernière valeur."""
+        with self.lock:
+            cpu = self.samples[-1].cpu_percent if self.samples else 0.0
+        self._record(cpu=cpu)
+        return self.latest()
+
+    def history(self, seconds=None):
+        """Échantillons (du plus ancien au plus récent) des `seconds` dernières secondes."""
+        with self.lock:
+            samples = list(self.samples)
+        if seconds is None or not samples:
+            return samples
+        since = samples[-1].timestamp - seconds
+        return [s for s in samples if s.timestamp >= since]
+
+    def latest(self):
+        with self.lock:
+            if self.samples:
+                return self.samples[-1]
+        # Pas encore démarré : une mesure ponctuelle, sans attente
+        mem = psutil.virtual_memory()
+        return ResourceSample(time.monotonic(), 0.0, mem.available, mem.percent, self.process.memory_info().rss)
+
+    def average(self, seconds=2.0):
+        """Moyenne glissante des échantillons récents (lisse les pics CPU ponctuels)."""
+        samples = self.history(seconds)
+        if not samples:
+            return self.latest()
+        n = len(samples)
+        return ResourceSample(
+            samples[-1].timestamp,
+            sum(s.cpu_percent for s in samples) / n,
+            sum(s.ram_available for s in samples) // n,
+            sum(s.ram_percent for s in samples) / n,
+            sum(s.process_rss for s in samples) // n
+        )
+
+    def trend(self, field="ram_available", seconds=30.0):
+        """Pente (unités par seconde, moindres carrés) d'un champ sur la fenêtre donnée."""
+        samples = self.history(seconds)
+        if len(samples) < 2:
+            return 0.0
+        xs = [s.timestamp for s in samples]
+        ys = [getattr(s, field) for s in samples]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        denominator = sum((x - mean_x) ** 2 for x in xs)
+        if denominator == 0:
+            return 0.0
+        return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
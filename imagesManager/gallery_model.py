@@ -0,0 +1,113 @@
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, QThreadPool, QSize
+from PyQt5.QtGui import QPixmap, QColor
+
+from imagesManager.thumbnail_cache import ThumbnailCache, ThumbnailLoader
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+
+class GalleryModel(QAbstractListModel):
+    """Modèle de la galerie : le dossier est lu par lots et les miniatures ne sont
+    chargées (en arrière-plan) que pour les lignes que la vue affiche."""
+
+    PathRole = Qt.UserRole + 1
+
+    def __init__(self, images_folder, thumb_size=120, batch_size=100, max_cached_pixmaps=300, parent=None):
+        super().__init__(parent)
+        self.images_folder = images_folder
+        self.batch_size = batch_size
+        self.max_cached_pixmaps = max_cached_pixmaps
+        self.paths = []
+        self.entries = None  # Itérateur os.scandir, consommé au fil du défilement
+        self.pixmaps = OrderedDict()  # LRU chemin -> QPixmap
+        self.pending = set()
+        self.cache = ThumbnailCache(size=thumb_size)
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(2)
+
+        self.placeholder = QPixmap(QSize(thumb_size, thumb_size))
+        self.placeholder.fill(QColor("#2d2d2d"))
+
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.paths = []
+        self.pixmaps.clear()
+        self.pending.clear()
+        if self.entries is not None:
+            self.entries.close()
+        self.entries = os.scandir(self.images_folder) if os.path.isdir(self.images_folder) else None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.entries is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        batch = []
+        for entry in self.entries:
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                batch.append(entry.path)
+                if len(batch) >= self.batch_size:
+                    break
+        else:
+            self.entries.close()
+            self.entries = None
+
+        if batch:
+            self.beginInsertRows(QModelIndex(), len(self.paths), len(self.paths) + len(batch) - 1)
+            self.paths.extend(batch)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ToolTipRole or role == self.PathRole:
+            return path
+        if role == Qt.DecorationRole:
+            pixmap = self.pixmaps.get(path)
+            if pixmap is not None:
+                self.pixmaps.move_to_end(path)
+                return pixmap
+            self.request_thumbnail(path)
+            return self.placeholder
+        return None
+
+    def request_thumbnail(self, path):
+        if path in self.pending:
+            return
+        self.pending.add(path)
+        loader = ThumbnailLoader(self.cache, path)
+        loader.signals.loaded.connect(self.on_thumbnail_loaded)
+        self.thread_pool.start(loader)
+
+    def on_thumbnail_loaded(self, path, image):
+        self.pending.discard(path)
+        if path not in self.paths or image.isNull():
+            return
+        self.pixmaps[path] = QPixmap.fromImage(image)  # Conversion dans le thread GUI
+        while len(self.pixmaps) > self.max_cached_pixmaps:
+            self.pixmaps.popitem(last=False)
+        row = self.paths.index(path)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def add_path(self, path):
+        self.beginInsertRows(QModelIndex(), len(self.paths), len(self.paths))
+        self.paths.append(path)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        path = self.paths.pop(row)
+        self.pixmaps.pop(path, None)
+        self.endRemoveRows()
@@ -11,40 +11,66 @@ except ImportError:
     USE_DIRECTML = False
 
 
-def generate_image(prompt: str, output_path: str = None):
+def load_pipeline():
     model_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "stable-diffusion-v1-5"))
     if not os.path.exists(model_path):
-        print(f"[ERREUR] Le modèle n'existe pas à : {model_path}")
-        return "[ERREUR] Modèle introuvable"
+        raise FileNotFoundError(f"Le modèle n'existe pas à : {model_path}")
 
-    try:
-        print(f"[INFO] Chargement du modèle depuis : {model_path}")
-        pipe = StableDiffusionPipeline.from_pretrained(model_path, safety_checker=None)
-
-        # 🧠 Tentative d'utilisation DirectML
-        if USE_DIRECTML:
-            try:
-                device = torch_directml.device()
-                pipe.to(device)
-                print("[INFO] Utilisation de DirectML pour l’inférence.")
-            except Exception as dml_error:
-                print(f"[AVERTISSEMENT] DirectML indisponible : {dml_error}")
-                pipe.to("cpu")
-                print("[INFO] Repli sur CPU.")
-        else:
+    print(f"[INFO] Chargement du modèle depuis : {model_path}")
+    pipe = StableDiffusionPipeline.from_pretrained(model_path, safety_checker=None)
+
+    # 🧠 Tentative d'utilisation DirectML
+    if USE_DIRECTML:
+        try:
+            device = torch_directml.device()
+            pipe.to(device)
+            print("[INFO] Utilisation de DirectML pour l’inférence.")
+        except Exception as dml_error:
+            print(f"[AVERTISSEMENT] DirectML indisponible : {dml_error}")
             pipe.to("cpu")
-            print("[INFO] DirectML non disponible → CPU utilisé.")
+            print("[INFO] Repli sur CPU.")
+    else:
+        pipe.to("cpu")
+        print("[INFO] DirectML non disponible → CPU utilisé.")
+
+    return pipe
+
+
+def run_pipeline(pipe, prompt: str, output_dir: str = "images", height: int = 384, width: int = 384, steps: int = 25,
+                 seed: int = None, step_callback=None):
+    # step_callback(étape, total) est appelé après chaque étape de débruitage ; il peut lever une
+    # exception pour interrompre la génération
+    extra = {}
+    if seed is not None:
+        # Bruit initial tiré sur CPU : même graine, même image quel que soit le device
+        extra["generator"] = torch.Generator("cpu").manual_seed(seed)
+    if step_callback is not None:
+        def on_step_end(pipeline, step, timestep, callback_kwargs):
+            step_callback(step + 1, steps)
+            return callback_kwargs
+        extra["callback_on_step_end"] = on_step_end
 
-        # Génération de l’image
-        image = pipe(prompt, height=384, width=384, num_inference_steps=25).images[0]
+    # Génération de l’image
+    image = pipe(prompt, height=height, width=width, num_inference_steps=steps, **extra).images[0]
 
-        filename = f"generated_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        output_path = os.path.join("images", filename)
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        image.save(output_path)
+    # Microsecondes : le worker persistant peut produire plusieurs images dans la même seconde
+    filename = f"generated_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
+    output_path = os.path.join(output_dir, filename)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    image.save(output_path)
 
-        print(f"[SUCCÈS] Image sauvegardée : {output_path}")
-        return f"[Image générée] #image {output_path}"
+    print(f"[SUCCÈS] Image sauvegardée : {output_path}")
+    return f"[Image générée] #image {output_path}"
+
+
+def generate_image(prompt: str, output_path: str = None):
+    try:
+        pipe = load_pipeline()
+        return run_pipeline(pipe, prompt)
+
+    except FileNotFoundError as e:
+        print(f"[ERREUR] {e}")
+        return "[ERREUR] Modèle introuvable"
 
     except Exception as e:
         print(f"[ERREUR] Échec génération image : {str(e)}")
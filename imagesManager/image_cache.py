@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def model_fingerprint(model_dir):
+    """Empreinte du modèle Stable Diffusion : configuration + taille/date des fichiers de poids."""
+    sha = hashlib.sha256()
+    if not os.path.isdir(model_dir):
+        return "absent"
+    for root, _, files in sorted(os.walk(model_dir)):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            sha.update(f"{os.path.relpath(path, model_dir)}:{stat.st_size}:{int(stat.st_mtime)}".encode("utf-8"))
+            if name.endswith(".json"):
+                with open(path, "rb") as f:
+                    sha.update(f.read())
+    return sha.hexdigest()
+
+
+def scheduler_name(model_dir):
+    config_path = os.path.join(model_dir, "scheduler", "scheduler_config.json")
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("_class_name", "inconnu")
+    except (OSError, ValueError):
+        return "inconnu"
+
+
+class ImageCache:
+    """Index adressé par contenu : (prompt, graine, étapes, taille, scheduler, modèle) -> fichier image.
+
+    Les images restent dans la galerie (views_images) ; au-delà de max_size_mb, les entrées les
+    moins récemment utilisées sont retirées de l'index (le fichier lui-même n'est pas supprimé).
+    """
+
+    def __init__(self, index_path="cache/image_cache.json", max_size_mb=512):
+        self.index_path = index_path
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[AVERTISSEMENT] Index du cache d'images illisible : {e}")
+
+    @staticmethod
+    def make_key(prompt, seed, steps, width, height, scheduler, model_hash):
+        payload = json.dumps([prompt.strip(), seed, steps, width, height, scheduler, model_hash], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not os.path.exists(entry["path"]):
+                if entry is not None:
+                    del self.entries[key]  # Image supprimée depuis la galerie
+                    self._save()
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self.hits += 1
+            self._save()
+            return entry["path"]
+
+    def put(self, key, path, prompt=""):
+        with self.lock:
+            self.entries[key] = {
+                "path": path,
+                "size": os.path.getsize(path),
+                "prompt": prompt,
+                "last_used": time.time()
+            }
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self.entries.values())
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_size_bytes:
+                break
+            total -= entry["size"]
+            del self.entries[key]
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
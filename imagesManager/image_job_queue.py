@@ -0,0 +1,119 @@
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from gestionnaire_ressources.job_scheduler import JobScheduler
+
+
+class ImageJob:
+    def __init__(self, job_id, prompt, priority=0, options=None):
+        self.job_id = job_id
+        self.prompt = prompt
+        self.priority = priority
+        self.options = options or {}
+        self.cancel_event = threading.Event()
+        self.status = "en attente"  # en attente / en cours / terminé / annulé
+
+
+class ImageJobQueue(QObject):
+    """File de génération d'images : priorités, progression par étape et annulation.
+
+    Les jobs passent par l'ordonnanceur commun (classe "image", max_concurrent à la fois) ;
+    chaque job en cours utilise son propre worker image de l'agent. Une priorité plus élevée passe devant.
+    """
+
+    job_queued = pyqtSignal(int, int)          # job_id, position dans la file (1 = prochain)
+    job_started = pyqtSignal(int)              # job_id
+    job_progress = pyqtSignal(int, int, int)   # job_id, étape, total
+    job_finished = pyqtSignal(int, str)        # job_id, résultat de agent.generate_image
+    job_cancelled = pyqtSignal(int)            # job_id
+
+    def __init__(self, agent, max_concurrent=1, scheduler=None):
+        super().__init__()
+        self.agent = agent
+        self.scheduler = scheduler or JobScheduler()
+        self.scheduler.set_limit("image", max_concurrent)
+        self.jobs = {}           # job_id (ordonnanceur) -> ImageJob
+        self.free_slots = list(range(max_concurrent))
+        self.lock = threading.Lock()
+
+    def submit(self, prompt, priority=0, **options):
+        """Renvoie l'id du job, ou None si la file de l'ordonnanceur est pleine."""
+        with self.lock:
+            job = ImageJob(None, prompt, priority, options)
+            job.job_id = self.scheduler.submit("image", self._run, job, priority=priority)
+            if job.job_id is None:
+                return None
+            self.jobs[job.job_id] = job
+        position = self.scheduler.position(job.job_id)
+        print(f"[IMAGE] Job {job.job_id} en file (position {position})")
+        self.job_queued.emit(job.job_id, position)
+        return job.job_id
+
+    def cancel(self, job_id):
+        """Annule un job en attente (retiré de la file) ou en cours (arrêté à la prochaine étape)."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in ("terminé", "annulé"):
+                return False
+            job.cancel_event.set()
+            removed = self.scheduler.cancel(job_id)
+            if removed:
+                self._finish(job, "annulé")
+        # Signal émis hors du verrou : les slots connectés peuvent rappeler la file (active_jobs...)
+        if removed:
+            self.job_cancelled.emit(job_id)
+        return True
+
+    def cancel_all(self):
+        for job_id in list(self.jobs.keys()):
+            self.cancel(job_id)
+
+    def position(self, job_id):
+        return self.scheduler.position(job_id)
+
+    def pending_count(self):
+        return self.scheduler.pending_count("image")
+
+    def active_jobs(self):
+        with self.lock:
+            return [job.job_id for job in self.jobs.values() if job.status == "en cours"]
+
+    def shutdown(self):
+        self.cancel_all()
+
+    def _finish(self, job, status):
+        job.status = status
+        self.jobs.pop(job.job_id, None)
+
+    def _run(self, job):
+        with self.lock:
+            cancelled = job.cancel_event.is_set()  # Annulé entre la sortie de file et le démarrage
+            if cancelled:
+                self._finish(job, "annulé")
+            else:
+                job.status = "en cours"
+                slot = self.free_slots.pop(0)
+        if cancelled:
+            self.job_cancelled.emit(job.job_id)
+            return
+
+        try:
+            self.job_started.emit(job.job_id)
+            result = self.agent.generate_image(
+                job.prompt,
+                on_progress=lambda step, total: self.job_progress.emit(job.job_id, step, total),
+                cancel_event=job.cancel_event,
+                slot=slot,
+                **job.options
+            )
+        finally:
+            with self.lock:
+                self.free_slots.append(slot)
+                cancelled = job.cancel_event.is_set()
+                self._finish(job, "annulé" if cancelled else "terminé")
+
+        if cancelled:
+            self.job_cancelled.emit(job.job_id)
+        else:
+            self.job_finished.emit(job.job_id, result)
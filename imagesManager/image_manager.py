@@ -3,33 +3,30 @@ import os
 import json
 import time
 import re
-import psutil
 import pyperclip
 import shutil  # Ajout pour deplacer les fichiers
 from html import escape
 
 # --- Third-party libraries ---
-import speech_recognition as sr
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters import HtmlFormatter
 from gestionnaire_ressources.resource_manager import IAResourceManager
 
 # --- PyQt5 ---
 from PyQt5.QtCore import (
     Qt, QThread, pyqtSignal, QMutex, QThreadPool, QRunnable, QTimer,
-    QMetaObject, Q_ARG, pyqtSlot, QObject
+    QMetaObject, Q_ARG, pyqtSlot, QObject, QSize
 )
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QLabel,
-    QCheckBox, QComboBox, QMessageBox, QScrollArea, QApplication, QDialog, QSizePolicy
+    QCheckBox, QComboBox, QMessageBox, QScrollArea, QApplication, QDialog, QSizePolicy,
+    QListView, QAbstractItemView
 )
-from PyQt5.QtGui import QPixmap, QTextCursor, QPalette, QColor, QFont, QMovie
+from PyQt5.QtGui import QPixmap, QTextCursor, QPalette, QColor, QFont, QMovie, QImageReader
 
 from utils.utils import RunnableFunc, StyledLabel
 
 # --- Projet ---
-from llama_cpp_agent import LlamaCppAgent
+from imagesManager.image_job_queue import ImageJobQueue
+from imagesManager.gallery_model import GalleryModel
 
 try:
     from PyQt5.QtCore import qRegisterMetaType
@@ -69,15 +66,21 @@ class Image_Manager(QWidget):
 
         self.setWindowTitle("Gestionnaire d'images")
         self.layout = QVBoxLayout(self)
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
 
-        self.container = QWidget()
-        self.container_layout = QVBoxLayout(self.container)
-        self.container_layout.setAlignment(Qt.AlignTop)
+        # Vue virtualisée : seules les lignes visibles demandent leur miniature
+        self.gallery_model = None
+        self.list_view = QListView()
+        self.list_view.setIconSize(QSize(120, 120))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSpacing(5)
+        self.list_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.doubleClicked.connect(lambda index: self.show_image(index.data(GalleryModel.PathRole)))
+        self.layout.addWidget(self.list_view)
 
-        self.scroll.setWidget(self.container)
-        self.layout.addWidget(self.scroll)
+        btn_delete = QPushButton("Supprimer")
+        btn_delete.clicked.connect(self.delete_selected_image)
+        self.layout.addWidget(btn_delete, alignment=Qt.AlignRight)
 
         # Initialisation du gestionnaire de ressources IA
         self.resource_manager = IAResourceManager(self.agent, max_threads=3, max_memory_gb=24)
@@ -87,56 +90,39 @@ class Image_Manager(QWidget):
         else:
             print("[WARN] Image_Manager: Pas de parent défini, signaux non connectés.")
 
+        # File de génération (uniquement pour l'instance reliée à l'agent)
+        self.job_queue = None
+        if self.agent is not None:
+            self.job_queue = ImageJobQueue(self.agent, max_concurrent=1, scheduler=self.resource_manager.scheduler)
+            self.job_queue.job_queued.connect(self.on_job_queued)
+            self.job_queue.job_progress.connect(self.on_job_progress)
+            self.job_queue.job_finished.connect(self.on_job_finished)
+            self.job_queue.job_cancelled.connect(self.on_job_cancelled)
+
 
         self.load_images()
 
     def load_images(self):
-        while self.container_layout.count():
-            item = self.container_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-
         if not os.path.exists(self.images_folder):
             QMessageBox.warning(self, "Dossier non trouv\u00e9", f"Le dossier {self.images_folder} n'existe pas.")
             return
 
-        images_files = [f for f in os.listdir(self.images_folder)
-                        if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif'))]
-
-        for img_file in images_files:
-            full_path = os.path.join(self.images_folder, img_file)
-            self.add_image_widget(full_path)
-
-    def add_image_widget(self, image_path):
-        widget = QWidget()
-        h_layout = QHBoxLayout(widget)
-        h_layout.setContentsMargins(5, 5, 5, 5)
-
-        label = QLabel()
-        pixmap = QPixmap(image_path)
-        pixmap = pixmap.scaled(120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        label.setPixmap(pixmap)
-        label.setFixedSize(120, 120)
-        label.setCursor(Qt.PointingHandCursor)
-        label.mousePressEvent = lambda event, p=image_path: self.show_image(p)
-        h_layout.addWidget(label)
-
-        name_label = QLabel(os.path.basename(image_path))
-        name_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        h_layout.addWidget(name_label)
-
-        btn_delete = QPushButton("Supprimer")
-        btn_delete.clicked.connect(lambda _, p=image_path, w=widget: self.delete_image(p, w))
-        h_layout.addWidget(btn_delete)
-
-        self.container_layout.addWidget(widget)
+        if self.gallery_model is None:
+            self.gallery_model = GalleryModel(self.images_folder, thumb_size=120, parent=self)
+            self.list_view.setModel(self.gallery_model)
+        else:
+            self.gallery_model.reload()
 
     def show_image(self, image_path):
         viewer = ImageViewer(image_path, self)
         viewer.exec_()
 
-    def delete_image(self, image_path, widget):
+    def delete_selected_image(self):
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            self.delete_image(index.data(GalleryModel.PathRole), index.row())
+
+    def delete_image(self, image_path, row):
         reply = QMessageBox.question(
             self, "Confirmer la suppression",
             f"Voulez-vous vraiment supprimer l'image:\n{os.path.basename(image_path)} ?",
@@ -145,110 +131,118 @@ class Image_Manager(QWidget):
         if reply == QMessageBox.Yes:
             try:
                 os.remove(image_path)
-                widget.deleteLater()
+                self.gallery_model.remove_row(row)
             except Exception as e:
                 QMessageBox.critical(self, "Erreur", f"Impossible de supprimer l'image:\n{e}")
 
-    def generate_image_from_text(self, text):
-
-        def can_generate_image():
-            mem = psutil.virtual_memory()
-            print(f"[DEBUG] RAM utilis\u00e9e : {mem.percent}%")
-            return mem.percent < 85
-
-        def afficher_erreur(message):
-            self.parent.clear_waiting_message()
-            self.parent.spinner_movie.stop()
-            self.parent.spinner_label.setVisible(False)
-            error_label = QLabel(f"<span style='color:red'><b>[ERREUR]</b> {message}</span>")
-            error_label.setWordWrap(True)
-            self.parent.scroll_layout.addWidget(error_label)
+    def generate_image_from_text(self, text, priority=0):
 
         self.parent.set_waiting_message("Alice r\u00e9fl\u00e9chit...")
         self.parent.spinner_label.setVisible(True)
         self.parent.spinner_movie.start()
         self.parent.waiting_label.setVisible(True)
 
-        label_wait = QLabel("<b>[Alice]</b> Je vais g\u00e9n\u00e9rer une image... Veuillez patienter \u23f3")
-        self.parent.scroll_layout.addWidget(label_wait)
+        self.parent.transcript.add_text("<b>[Alice]</b> Je vais g\u00e9n\u00e9rer une image... Veuillez patienter \u23f3")
         QApplication.processEvents()
 
-        if not self.resource_manager.ressources_disponibles():
-            print("[INFO] Requête refusée: surcharge CPU ou RAM")
-            return "Les ressources système sont surchargées. Veuillez réessayer plus tard."
-
+        QTimer.singleShot(100, self.parent.transcript_view.scrollToBottom)
 
-        def run():
-            print("[DEBUG] \u2192 D\u00e9but de run() image")
+        # "#variation" demande une nouvelle image même si ce prompt a déjà été dessiné
+        force_new = "#variation" in text
+        text = text.replace("#variation", "").strip()
 
-            if not can_generate_image():
-                afficher_erreur("M\u00e9moire insuffisante pour g\u00e9n\u00e9rer une image. Veuillez fermer des applications ou r\u00e9essayer plus tard.")
+        # Image déjà dessinée : affichée tout de suite, sans attendre derrière une diffusion en cours
+        if not force_new:
+            cached_path = self.agent.cached_image(text)
+            if cached_path:
+                self.parent.image_path_result = cached_path
+                self.display_generated_image()
+                self.end_job()
                 return
 
-            result = self.agent.generate_image(text)
-            print("[DEBUG] >>> resultat chemin generation image :", result)
-            image_path = result.split("#image")[-1].strip() if result and "#image" in result else None
+        # Le job attend son tour dans l'ordonnanceur (un job image à la fois, ressources permettant)
+        if self.job_queue.submit(text, priority=priority, force_new=force_new) is None:
+            self.afficher_erreur("Trop de demandes en attente. Veuillez r\u00e9essayer dans un instant.")
+            return
+        self.parent.stop_button.setVisible(True)
 
-            if image_path and os.path.exists(image_path):
-                correct_folder = "imagesManager/views_images"
-                os.makedirs(correct_folder, exist_ok=True)
-                correct_path = os.path.join(correct_folder, os.path.basename(image_path))
+    def cancel_all_jobs(self):
+        if self.job_queue is not None:
+            self.job_queue.cancel_all()
 
-                if image_path != correct_path:
-                    try:
-                        shutil.move(image_path, correct_path)
-                        print(f"[DEBUG] Image d\u00e9plac\u00e9e vers : {correct_path}")
-                        image_path = correct_path
-                    except Exception as e:
-                        print(f"[ERREUR] Impossible de d\u00e9placer l'image : {e}")
+    def afficher_erreur(self, message):
+        self.parent.clear_waiting_message()
+        self.parent.spinner_movie.stop()
+        self.parent.spinner_label.setVisible(False)
+        self.parent.transcript.add_text(f"<span style='color:red'><b>[ERREUR]</b> {message}</span>")
 
-            print("[DEBUG] >>> resultat chemin image_path :", image_path)
+    def on_job_queued(self, job_id, position):
+        if position > 1 or self.job_queue.active_jobs():
+            self.parent.set_waiting_message(f"Image en file d'attente (position {position})...")
 
-            if not image_path or not os.path.exists(image_path):
-                afficher_erreur("L'image n'a pas pu \u00eatre g\u00e9n\u00e9r\u00e9e. Chemin invalide ou g\u00e9n\u00e9ration \u00e9chou\u00e9e.")
-                return
+    def on_job_progress(self, job_id, step, total):
+        self.parent.waiting_label.setText(f"G\u00e9n\u00e9ration de l'image : \u00e9tape {step}/{total}")
 
-            self.parent.image_path_result = image_path
-            self.parent.clear_waiting_message()
-            self.parent.spinner_movie.stop()
-            self.parent.spinner_label.setVisible(False)
-            QTimer.singleShot(0, self.display_generated_image)
+    def on_job_cancelled(self, job_id):
+        self.parent.transcript.add_text("<b>[Alice]</b> G\u00e9n\u00e9ration d'image annul\u00e9e.")
+        self.end_job()
 
-        QTimer.singleShot(100, lambda: self.parent.scroll_area.verticalScrollBar().setValue(
-            self.parent.scroll_area.verticalScrollBar().maximum()))
+    def on_job_finished(self, job_id, result):
+        print("[DEBUG] >>> resultat chemin generation image :", result)
+        image_path = result.split("#image")[-1].strip() if result and "#image" in result else None
 
-        QThreadPool.globalInstance().start(RunnableFunc(run))
+        if image_path and os.path.exists(image_path):
+            correct_folder = "imagesManager/views_images"
+            os.makedirs(correct_folder, exist_ok=True)
+            correct_path = os.path.join(correct_folder, os.path.basename(image_path))
+
+            if image_path != correct_path:
+                try:
+                    shutil.move(image_path, correct_path)
+                    print(f"[DEBUG] Image d\u00e9plac\u00e9e vers : {correct_path}")
+                    image_path = correct_path
+                except Exception as e:
+                    print(f"[ERREUR] Impossible de d\u00e9placer l'image : {e}")
+
+        print("[DEBUG] >>> resultat chemin image_path :", image_path)
+
+        if not image_path or not os.path.exists(image_path):
+            self.afficher_erreur("L'image n'a pas pu \u00eatre g\u00e9n\u00e9r\u00e9e. Chemin invalide ou g\u00e9n\u00e9ration \u00e9chou\u00e9e.")
+            self.end_job()
+            return
+
+        self.parent.image_path_result = image_path
+        self.display_generated_image()
+        self.end_job()
+
+    def end_job(self):
+        # Plus rien en cours ni en attente : on masque l'attente ; le bouton Stop suit l'ordonnanceur
+        if not self.job_queue.active_jobs() and not self.job_queue.pending_count():
+            self.parent.clear_waiting_message()
+            self.parent.spinner_label.setVisible(False)
+        self.parent.update_stop_button()
 
     def display_generated_image(self):
         print("[DEBUG] \u2192 Entr\u00e9e dans display_generated_image()")
         image_path = getattr(self.parent, 'image_path_result', None)
         if image_path and os.path.exists(image_path):
             full_path = os.path.abspath(image_path).replace("\\", "/")
-            pixmap = QPixmap(full_path)
-            print(f"[DEBUG] Chargement pixmap depuis : {full_path} | Null ? {pixmap.isNull()}")
-
-            if not pixmap.isNull():
-                label = QLabel("<b>[Alice]</b> Voici votre image g\u00e9n\u00e9r\u00e9e :")
-                label.setWordWrap(True)
-                label.setStyleSheet("margin-top: 2px; margin-bottom: 2px; line-height: 1.2em;")
-                self.parent.scroll_layout.addWidget(label)
-
-                img_label = QLabel()
-                img_label.setAlignment(Qt.AlignCenter)
-                img_label.setPixmap(pixmap.scaledToWidth(350, Qt.SmoothTransformation))
-                img_label.setStyleSheet("margin-top: 10px; margin-bottom: 10px;")
-                self.parent.scroll_layout.addWidget(img_label)
+            valid = QImageReader(full_path).canRead()
+            print(f"[DEBUG] Image lisible depuis : {full_path} | {valid}")
+
+            if valid:
+                # Le délégué du transcript affiche une miniature (350 px) chargée à la demande
+                self.parent.transcript.add_image(full_path, "<b>[Alice]</b> Voici votre image g\u00e9n\u00e9r\u00e9e :")
                 self.parent.save_button.setEnabled(True)
             else:
-                self.parent.scroll_layout.addWidget(QLabel("<b>[Alice]</b> L'image est invalide ou corrompue."))
+                self.parent.transcript.add_text("<b>[Alice]</b> L'image est invalide ou corrompue.")
         else:
-            self.parent.scroll_layout.addWidget(QLabel("<b>[Alice]</b> Erreur : image introuvable."))
+            self.parent.transcript.add_text("<b>[Alice]</b> Erreur : image introuvable.")
 
         self.parent.voice_recognition_thread.resume()
         
         # Scroll automatique vers le bas
-        QTimer.singleShot(100, lambda: self.parent.scroll_area.verticalScrollBar().setValue(
-            self.parent.scroll_area.verticalScrollBar().maximum()))
+        QTimer.singleShot(100, self.parent.transcript_view.scrollToBottom)
 
 
 
@@ -0,0 +1,150 @@
+import gc
+import multiprocessing
+import threading
+import time
+
+
+class ImageJobCancelled(Exception):
+    """Levée quand une génération d'image est annulée entre deux étapes."""
+
+
+def worker_main(conn, idle_timeout):
+    """Boucle du processus de génération : le pipeline Stable Diffusion est chargé une seule fois."""
+    # Import dans le processus fils uniquement : torch/diffusers ne sont jamais chargés dans l'UI
+    from imagesManager.generate import load_pipeline, run_pipeline
+
+    pipe = None
+    while True:
+        # Sans job pendant idle_timeout secondes, le pipeline est déchargé pour libérer la RAM
+        if not conn.poll(idle_timeout if pipe is not None else None):
+            pipe = None
+            gc.collect()
+            print("[INFO] Pipeline image déchargé après inactivité.")
+            continue
+
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+
+        kind = message.get("type")
+        if kind == "ping":
+            conn.send({"type": "pong", "loaded": pipe is not None})
+        elif kind == "shutdown":
+            break
+        elif kind == "generate":
+            def on_step(step, total):
+                conn.send({"type": "progress", "step": step, "total": total})
+                # Annulation vérifiée entre deux étapes de débruitage
+                while conn.poll(0):
+                    if conn.recv().get("type") == "cancel":
+                        raise ImageJobCancelled()
+
+            cancelled = False
+            try:
+                if pipe is None:
+                    pipe = load_pipeline()
+                result = run_pipeline(pipe, message["prompt"], step_callback=on_step, **message.get("options", {}))
+            except ImageJobCancelled:
+                print("[INFO] Génération d'image annulée.")
+                result = "[ANNULÉ]"
+                cancelled = True
+            except Exception as e:
+                print(f"[ERREUR] Échec génération image : {str(e)}")
+                result = f"[ERREUR] {str(e)}"
+            conn.send({"type": "result", "result": result, "cancelled": cancelled})
+
+    conn.close()
+
+
+class ImageWorkerClient:
+    """Pilote le processus de génération d'images (démarrage, contrôle de santé, redémarrage)."""
+
+    def __init__(self, idle_unload_minutes=10, timeout=300):
+        self.idle_timeout = idle_unload_minutes * 60
+        self.timeout = timeout
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()  # Un job à la fois par processus
+        self.context = multiprocessing.get_context("spawn")
+
+    def start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=worker_main, args=(child_conn, self.idle_timeout), daemon=True, name="AliceImageWorker"
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        print(f"[INFO] Worker image démarré (pid={self.process.pid})")
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def ping(self, timeout=5):
+        """Contrôle de santé : le processus doit répondre à un ping dans le délai imparti."""
+        if not self.is_alive():
+            return False
+        try:
+            self.conn.send({"type": "ping"})
+            if not self.conn.poll(timeout):
+                return False
+            return self.conn.recv().get("type") == "pong"
+        except (EOFError, OSError):
+            return False
+
+    def ensure_healthy(self):
+        if not self.ping():
+            if self.process is not None:
+                print("[AVERTISSEMENT] Worker image sans réponse, redémarrage.")
+                self.kill()
+            self.start()
+
+    def generate(self, prompt, on_progress=None, cancel_event=None, **options):
+        """Génère une image ; on_progress(étape, total) suit le débruitage, cancel_event l'interrompt."""
+        with self.lock:
+            self.ensure_healthy()
+            start = time.perf_counter()
+            deadline = start + self.timeout
+            cancel_sent = False
+            try:
+                self.conn.send({"type": "generate", "prompt": prompt, "options": options})
+                while True:
+                    if cancel_event is not None and cancel_event.is_set() and not cancel_sent:
+                        self.conn.send({"type": "cancel"})
+                        cancel_sent = True
+                    if time.perf_counter() > deadline:
+                        self.kill()  # Processus bloqué : il sera relancé au prochain job
+                        raise TimeoutError(f"Génération d'image au-delà de {self.timeout}s")
+                    if not self.conn.poll(0.2):
+                        continue
+                    message = self.conn.recv()
+                    if message["type"] == "progress":
+                        if on_progress:
+                            on_progress(message["step"], message["total"])
+                    elif message["type"] == "result":
+                        break
+            except (EOFError, OSError) as e:
+                self.kill()
+                raise RuntimeError(f"Worker image interrompu : {e}")
+
+            if message.get("cancelled"):
+                raise ImageJobCancelled()
+            print(f"[INFO] Image générée par le worker en {time.perf_counter() - start:.1f}s")
+            return message["result"]
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+            self.process.join(5)
+        self.process = None
+        self.conn = None
+
+    def shutdown(self):
+        if self.is_alive():
+            try:
+                self.conn.send({"type": "shutdown"})
+                self.process.join(5)
+            except (EOFError, OSError):
+                pass
+        self.kill()
@@ -0,0 +1,61 @@
+import hashlib
+import os
+
+from PyQt5.QtCore import QObject, QRunnable, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+
+
+class ThumbnailCache:
+    """Miniatures persistantes sur disque, indexées par chemin + date de modification + taille du fichier."""
+
+    def __init__(self, cache_dir="cache/thumbnails", size=120):
+        self.cache_dir = cache_dir
+        self.size = size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def thumbnail_path(self, image_path):
+        stat = os.stat(image_path)
+        key = f"{os.path.abspath(image_path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def load(self, image_path):
+        """Retourne la miniature (QImage) ; à appeler hors du thread GUI."""
+        thumb_path = self.thumbnail_path(image_path)
+        if os.path.exists(thumb_path):
+            image = QImage(thumb_path)
+            if not image.isNull():
+                return image
+
+        # Décodage directement à la taille réduite : l'image pleine résolution n'est jamais chargée
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid():
+            reader.setScaledSize(original.scaled(QSize(self.size, self.size), Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            print(f"[AVERTISSEMENT] Miniature impossible pour {image_path} : {reader.errorString()}")
+            return image
+
+        image.save(thumb_path, "PNG")
+        return image
+
+
+class ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)  # chemin de l'image, miniature
+
+
+class ThumbnailLoader(QRunnable):
+    def __init__(self, cache, image_path):
+        super().__init__()
+        self.cache = cache
+        self.image_path = image_path
+        self.signals = ThumbnailSignals()
+
+    def run(self):
+        try:
+            image = self.cache.load(self.image_path)
+        except OSError as e:
+            print(f"[AVERTISSEMENT] Lecture impossible de {self.image_path} : {e}")
+            image = QImage()
+        self.signals.loaded.emit(self.image_path, image)
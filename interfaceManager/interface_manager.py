@@ -8,6 +8,7 @@ from PyQt5.QtGui import QMovie, QFont
 from PyQt5.QtCore import Qt, QSize
 
 from utils.utils import StyledLabel, InputTextEdit
+from interfaceManager.transcript import TranscriptModel, TranscriptView
 
 
 class InterfaceManager:
@@ -24,8 +25,9 @@ class InterfaceManager:
                 font-family: 'Times New Roman', serif;
                 font-size: 16px;
             }
-            QScrollArea {
+            QScrollArea, QListView {
                 background-color: #121212;
+                border: none;
             }
             QTextEdit {
                 background-color: #1e1e1e;
@@ -66,6 +68,7 @@ class InterfaceManager:
 
         self.parent.model_selector = QComboBox()
         self.parent.model_selector.addItems(self.parent.model_paths.keys())
+        self.parent.model_selector.setCurrentText(self.parent.images.selected_model)
         self.parent.model_selector.currentTextChanged.connect(self.parent.load_model)
         top_controls.addWidget(self.parent.model_selector)
 
@@ -91,6 +94,10 @@ class InterfaceManager:
         self.parent.memory_button.clicked.connect(self.parent.open_memory_window)
         top_controls.addWidget(self.parent.memory_button)
 
+        self.parent.new_conversation_button = QPushButton("Nouvelle conversation")
+        self.parent.new_conversation_button.clicked.connect(self.parent.new_conversation)
+        top_controls.addWidget(self.parent.new_conversation_button)
+
         self.parent.save_button = QPushButton("Sauvegarder")
         self.parent.save_button.clicked.connect(self.parent.save_prompt)
         self.parent.save_button.setEnabled(False)
@@ -98,17 +105,13 @@ class InterfaceManager:
 
         layout.addLayout(top_controls)
 
-        # --- Scroll area for response ---
-        self.parent.scroll_area = QScrollArea()
-        self.parent.scroll_area.setWidgetResizable(True)
-        self.parent.scroll_widget = QWidget()
-        self.parent.scroll_layout = QVBoxLayout(self.parent.scroll_widget)
-        self.parent.scroll_layout.setAlignment(Qt.AlignTop)
-        self.parent.scroll_layout.setSpacing(0)
-        self.parent.scroll_layout.setContentsMargins(0, 0, 0, 0)
-        self.parent.scroll_area.setWidget(self.parent.scroll_widget)
-        self.parent.scroll_area.setFont(QFont("Times New Roman", 14))
-        layout.addWidget(self.parent.scroll_area)
+        # --- Transcript (vue virtualisée des messages) ---
+        self.parent.transcript = TranscriptModel(max_resident=200)
+        self.parent.transcript_view = TranscriptView()
+        self.parent.transcript_view.setModel(self.parent.transcript)
+        self.parent.transcript_view.setFont(QFont("Times New Roman", 14))
+        self.parent.transcript_view.image_activated.connect(self.parent.show_image)
+        layout.addWidget(self.parent.transcript_view)
 
         # --- Waiting container ---
         self.parent.waiting_container = QWidget()
@@ -145,5 +148,12 @@ class InterfaceManager:
         self.parent.send_button.setFixedHeight(40)
         bottom_layout.addWidget(self.parent.send_button)
 
+        # Stop : reste visible pendant le streaming (le conteneur d'attente est masqué dès le premier token)
+        self.parent.stop_button = QPushButton("⏹ Stop")
+        self.parent.stop_button.setFixedSize(90, 40)
+        self.parent.stop_button.clicked.connect(self.parent.stop_generation)
+        self.parent.stop_button.setVisible(False)
+        bottom_layout.addWidget(self.parent.stop_button)
+
         layout.addLayout(bottom_layout)
         self.parent.setLayout(layout)
@@ -0,0 +1,288 @@
+# interfaceManager/transcript.py
+
+import json
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime
+
+import pyperclip
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QTextDocument, QColor, QPixmap
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView, QMenu
+
+from imagesManager.thumbnail_cache import ThumbnailCache, ThumbnailLoader
+
+MESSAGE_ROLE = Qt.UserRole + 1
+IMAGE_WIDTH = 350
+DOCUMENT_STYLE = "body { color: #f0f0f0; } pre { margin: 0; }"
+
+
+class TranscriptStore:
+    """Messages du fil de discussion : seuls les max_resident plus récemment utilisés restent en RAM,
+    les autres sont écrits dans un fichier d'échange JSONL et relus à la demande."""
+
+    def __init__(self, spill_dir="cache/transcripts", max_resident=200):
+        os.makedirs(spill_dir, exist_ok=True)
+        self.path = os.path.join(spill_dir, f"transcript_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl")
+        self.file = open(self.path, "a+b")
+        self.max_resident = max_resident
+        self.offsets = []               # Position de chaque message dans le fichier (None = jamais écrit)
+        self.resident = OrderedDict()   # ligne -> [message, modifié depuis la dernière écriture]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, message):
+        row = len(self.offsets)
+        self.offsets.append(None)
+        self.resident[row] = [message, True]
+        self._evict()
+        return row
+
+    def get(self, row):
+        if row in self.resident:
+            self.resident.move_to_end(row)
+            return self.resident[row][0]
+        self.file.seek(self.offsets[row])
+        message = json.loads(self.file.readline().decode("utf-8"))
+        self.resident[row] = [message, False]
+        self._evict()
+        return message
+
+    def update(self, row, message):
+        self.get(row)
+        self.resident[row] = [message, True]
+
+    def close(self):
+        self.file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _evict(self):
+        while len(self.resident) > self.max_resident:
+            row, (message, dirty) = self.resident.popitem(last=False)
+            if dirty:
+                self.file.seek(0, os.SEEK_END)
+                self.offsets[row] = self.file.tell()
+                self.file.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.file.flush()
+
+
+class TranscriptModel(QAbstractListModel):
+    """Modèle du fil de discussion : messages texte, code et image.
+    Les miniatures sont décodées en arrière-plan, comme dans la galerie."""
+
+    def __init__(self, max_resident=200, max_cached_pixmaps=30, parent=None):
+        super().__init__(parent)
+        self.store = TranscriptStore(max_resident=max_resident)
+        self.heights = {}  # ligne -> (largeur, hauteur) calculée par le délégué
+        self.thumbnails = ThumbnailCache(size=IMAGE_WIDTH)
+        self.pixmaps = OrderedDict()  # LRU chemin -> QPixmap (nulle si l'image est illisible)
+        self.max_cached_pixmaps = max_cached_pixmaps
+        self.sizes = {}       # chemin -> taille de la miniature, conservée après éviction du pixmap
+        self.image_rows = {}  # chemin -> lignes qui affichent cette image
+        self.pending = set()
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(2)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == MESSAGE_ROLE:
+            return self.store.get(index.row())
+        return None
+
+    def add_message(self, message):
+        row = len(self.store)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.store.append(message)
+        self.endInsertRows()
+        return row
+
+    def add_text(self, html):
+        return self.add_message({"kind": "text", "html": html})
+
+    def add_code(self, highlighted_html, raw_code):
+        return self.add_message({"kind": "code", "html": highlighted_html, "raw": raw_code})
+
+    def add_image(self, image_path, caption_html=""):
+        row = self.add_message({"kind": "image", "html": caption_html, "path": image_path})
+        self.image_rows.setdefault(image_path, []).append(row)
+        return row
+
+    def thumbnail(self, path):
+        """Miniature prête (QPixmap, nulle si illisible) ou None : elle est alors demandée en arrière-plan."""
+        pixmap = self.pixmaps.get(path)
+        if pixmap is not None:
+            self.pixmaps.move_to_end(path)
+            return pixmap
+        if path not in self.pending:
+            self.pending.add(path)
+            loader = ThumbnailLoader(self.thumbnails, path)
+            loader.signals.loaded.connect(self.on_thumbnail_loaded)
+            self.thread_pool.start(loader)
+        return None
+
+    def image_size(self, path):
+        """Taille réservée à l'image : celle de la miniature une fois connue, sinon le cadre d'attente."""
+        return self.sizes.get(path, QSize(IMAGE_WIDTH, IMAGE_WIDTH))
+
+    def on_thumbnail_loaded(self, path, image):
+        self.pending.discard(path)
+        self.pixmaps[path] = QPixmap.fromImage(image)  # Conversion dans le thread GUI
+        while len(self.pixmaps) > self.max_cached_pixmaps:
+            self.pixmaps.popitem(last=False)
+        size = image.size() if not image.isNull() else QSize(0, 0)
+        rows = self.image_rows.get(path, [])
+        if self.sizes.get(path) != size:
+            self.sizes[path] = size
+            for row in rows:
+                self.heights.pop(row, None)  # Hauteur recalculée avec la vraie taille
+        for row in rows:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [MESSAGE_ROLE])
+
+    def update_text(self, row, html):
+        message = dict(self.store.get(row), html=html)
+        self.store.update(row, message)
+        self.heights.pop(row, None)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [MESSAGE_ROLE])
+
+    def clear(self):
+        """Vide le fil (nouvelle conversation) ; les miniatures déjà chargées restent en cache."""
+        self.beginResetModel()
+        self.store.close()
+        self.store = TranscriptStore(max_resident=self.store.max_resident)
+        self.heights.clear()
+        self.image_rows.clear()
+        self.endResetModel()
+
+    def close(self):
+        self.thread_pool.clear()
+        self.thread_pool.waitForDone()
+        self.store.close()
+
+
+class TranscriptDelegate(QStyledItemDelegate):
+    """Dessine les messages sans widget : QTextDocument pour le texte et le code, miniature pour les images.
+    Aucune lecture de fichier ici : tant que la miniature n'est pas prête, un cadre de taille fixe la remplace."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.padding = 4
+
+    def make_document(self, message, width, font):
+        document = QTextDocument()
+        document.setDefaultFont(font)
+        document.setDefaultStyleSheet(DOCUMENT_STYLE)
+        document.setDocumentMargin(self.padding)
+        html = message.get("html", "")
+        if message["kind"] == "code":
+            html = re.sub(r"</?pre[^>]*>", "", html, flags=re.IGNORECASE)
+            html = f"<div style='font-family: Consolas, monospace; font-size: 13px; white-space: pre-wrap;'>{html}</div>"
+        document.setHtml(html)
+        document.setTextWidth(width)
+        return document
+
+    def content_width(self):
+        return max(100, self.parent().viewport().width() - 2 * self.padding)
+
+    def sizeHint(self, option, index):
+        model = index.model()
+        width = self.content_width()
+        cached = model.heights.get(index.row())
+        if cached and cached[0] == width:
+            return QSize(width, cached[1])
+
+        message = index.data(MESSAGE_ROLE)
+        height = int(self.make_document(message, width, option.font).size().height())
+        if message["kind"] == "image":
+            image_height = model.image_size(message["path"]).height()
+            if image_height:
+                height += image_height + 20
+        model.heights[index.row()] = (width, height)
+        return QSize(width, height)
+
+    def paint(self, painter, option, index):
+        message = index.data(MESSAGE_ROLE)
+        rect = option.rect
+        painter.save()
+
+        document = self.make_document(message, self.content_width(), option.font)
+        if message["kind"] == "code":
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#1e1e1e"))
+            painter.drawRoundedRect(QRectF(rect.adjusted(2, 2, -2, -2)), 4, 4)
+
+        painter.translate(rect.left() + self.padding, rect.top())
+        document.drawContents(painter)
+
+        if message["kind"] == "image":
+            model = index.model()
+            pixmap = model.thumbnail(message["path"])
+            size = model.image_size(message["path"])
+            x = (rect.width() - size.width()) // 2
+            y = int(document.size().height()) + 10
+            if pixmap is None:
+                painter.fillRect(x, y, size.width(), size.height(), QColor("#2d2d2d"))
+            elif not pixmap.isNull():
+                painter.drawPixmap(x, y, pixmap)
+
+        painter.restore()
+
+
+class TranscriptView(QListView):
+    """Vue virtualisée du fil : seuls les messages visibles sont dessinés."""
+
+    image_activated = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(TranscriptDelegate(self))
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(100)
+        self.setWordWrap(True)
+        self.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+        self.doubleClicked.connect(self.on_double_click)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.scheduleDelayedItemsLayout()  # Les hauteurs dépendent de la largeur
+
+    def copy_message(self, message):
+        if message["kind"] == "code":
+            pyperclip.copy(message["raw"])
+        else:
+            document = QTextDocument()
+            document.setHtml(message.get("html", ""))
+            pyperclip.copy(document.toPlainText())
+
+    def on_double_click(self, index):
+        message = index.data(MESSAGE_ROLE)
+        if message["kind"] == "code":
+            self.copy_message(message)
+        elif message["kind"] == "image":
+            self.image_activated.emit(message["path"])
+
+    def show_context_menu(self, position):
+        index = self.indexAt(position)
+        if not index.isValid():
+            return
+        message = index.data(MESSAGE_ROLE)
+        menu = QMenu(self)
+        label = "📋 Copier le code" if message["kind"] == "code" else "📋 Copier le texte"
+        menu.addAction(label, lambda: self.copy_message(message))
+        if message["kind"] == "image":
+            menu.addAction("🖼️ Ouvrir l'image", lambda: self.image_activated.emit(message["path"]))
+        menu.exec_(self.viewport().mapToGlobal(position))
@@ -1,183 +1,524 @@
-import json
-import pyttsx3
-import subprocess
-from llama_cpp import Llama
-from db_mysql_Manager.mysql_manager import MySQLManager
+import random
+from utils.storage import create_storage
+from db_mysql_Manager.write_behind import MemoryWriteBehind
 import threading
-from datetime import datetime
-from imagesManager import generate 
-from imagesManager.generate import generate_image
-from diffusers import StableDiffusionPipeline
-import torch_directml
+import time
 import os
 
 from erreurManager.error_handler import ErrorHandler
+from modelManager.model_registry import ModelRegistry
+from modelManager.prompt_state_cache import PromptStateCache
+from modelManager.response_cache import ResponseCache
+from modelManager.cancellation import CancellationToken
+from modelManager.warmup import ModelWarmup
+from memoireManager.memory_index import MemoryIndex, create_embedder
+from voixManager.tts_worker import TTSWorker
+from imagesManager.image_worker import ImageWorkerClient, ImageJobCancelled
+from imagesManager.image_cache import ImageCache, model_fingerprint as image_model_fingerprint, scheduler_name as image_scheduler_name
+
+
+LLAMA_PARAMS = dict(
+    n_ctx=2048,            # Contexte plus large si utile (selon ta RAM)
+    n_batch=512,           # Meilleure vitesse (valeurs entre 256 et 1024 selon la RAM)
+    n_threads=6,           # Autant que ton nombre de cœurs CPU
+    n_gpu_layers=0,        # Si tu veux tout sur CPU. Sinon adapte.
+    seed=42,
+    use_mmap=True,         # Chargement mémoire optimisé
+    use_mlock=True,        # Évite le swap (garde en RAM)
+    f16_kv=True,           # Active les clés/valeurs float16 (accélère le modèle)
+    logits_all=False,      # Utile si tu n'as pas besoin de tous les logits
+    verbose=False          # Optionnel : désactive les logs verbeux
+)
+
+
+SYSTEM_PROMPT = (
+    "Tu es une IA qui parle exclusivement en français.\n"
+    "Réponds toujours de façon claire et concise.\n"
+)
+
+
+CODE_PROMPT_PREFIX = """Tu es un assistant expert en programmation. 
+            Ne retourne que du code. Ne mets aucune explication. Réponds uniquement avec un bloc de code Markdown.
+
+            ### Question
+            """
+
+
+IMAGE_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "imagesManager", "stable-diffusion-v1-5")
+IMAGE_OUTPUT_DIR = "imagesManager/views_images"
+IMAGE_DEFAULT_OPTIONS = dict(
+    height=384,
+    width=384,
+    steps=25,
+    seed=42                # Graine par défaut : une même demande redonne la même image (cache)
+)
+
+CODE_SAMPLING_PARAMS = dict(
+    max_tokens=400,
+    temperature=0.1,
+    top_p=1.0,
+    seed=42                # Graine fixe : même demande, même code (requis pour le cache de réponses)
+)
+
+
+class ConversationSession:
+    """Historique d'une conversation multi-tours et état KV llama.cpp associé."""
+
+    def __init__(self, system_prompt=SYSTEM_PROMPT):
+        self.system_prompt = system_prompt
+        self.turns = []           # Texte de chaque tour tel qu'évalué par le modèle (souvenirs compris)
+        self.state = None         # LlamaState sauvegardé quand un autre prompt utilise le modèle
+        self.state_model = None   # Modèle auquel appartient self.state
+
+    @staticmethod
+    def render_turn(user_message: str, context: str = "") -> str:
+        return f"{context}Utilisateur : {user_message}\nAlice :"
+
+    def build_prompt(self, user_message: str, context: str = "") -> str:
+        # Chaque tour est conservé exactement tel qu'il a été évalué (souvenirs et réponse générée) :
+        # le prompt précédent suivi de la réponse reste un préfixe du prompt suivant, seul le
+        # nouveau tour est évalué. (Ré-afficher l'historique sans les souvenirs invaliderait ce préfixe.)
+        return f"{self.system_prompt}{''.join(self.turns)}{self.render_turn(user_message, context)}"
+
+    def append(self, user_message: str, answer: str, context: str = ""):
+        # La génération reprend après "Alice :" avec un espace initial : même texte que celui du cache KV
+        self.turns.append(f"{self.render_turn(user_message, context)} {answer}\n")
+
+    def trim(self, model, max_tokens: int):
+        # Oublie les tours les plus anciens si l'historique ne tient plus dans le contexte
+        budget = model.n_ctx() - max_tokens
+        while self.turns:
+            tokens = model.tokenize(self.build_prompt("").encode("utf-8"))
+            if len(tokens) <= budget:
+                break
+            self.turns.pop(0)
 
 
 class LlamaCppAgent:
-    def __init__(self, model_paths: dict, selected_model="Mistral-7B-Instruct", error_handler=None):
+    def __init__(self, model_paths: dict, selected_model="Mistral-7B-Instruct", error_handler=None, load_now=True, warmup=True,
+                 storage=None):
         self.error_handler = error_handler or ErrorHandler()
 
         self.model_paths = model_paths
-        self.model_path = model_paths.get(selected_model)
-        if not self.model_path or not os.path.exists(self.model_path):
-            raise FileNotFoundError(f"Modèle introuvable : {self.model_path}")
+        self.registry = ModelRegistry()
+        self.generation_lock = threading.RLock()  # Un seul décodage à la fois sur le modèle
+        self.active_cancel_token = None  # Jeton de la génération en cours (bouton Stop)
+        self.session = ConversationSession()
+        self.kv_owner = None  # Session dont l'état occupe actuellement le cache KV du modèle
+        self.prompt_cache = PromptStateCache()
+        self.prefix_states = {}  # Préfixe -> LlamaState du modèle courant
+        self.response_cache = ResponseCache()
+        self.model = None
+        self.model_path = None
+        self.selected_model = selected_model
+        self.model_ready = threading.Event()
+        self.warmup_enabled = warmup  # Préchauffage des poids mmap après chaque chargement
+        self.last_warmup = None  # Statistiques du dernier préchauffage
+        if load_now:
+            self.load_model(selected_model)
+        # Sinon : chargement en arrière-plan par ModelLoader, une fois la fenêtre affichée
+
+        # 🔊 Synthèse vocale dans son propre thread : l'interface reste fluide pendant qu'Alice parle
+        self.tts = TTSWorker(voice_hint="french")
 
-        print(f"[INFO] Chargement du modèle : {self.model_path}")
-        try:
-            self.model = Llama(
-                model_path=self.model_path,
-                n_ctx=2048,            # Contexte plus large si utile (selon ta RAM)
-                n_batch=512,           # Meilleure vitesse (valeurs entre 256 et 1024 selon la RAM)
-                n_threads=6,           # Autant que ton nombre de cœurs CPU
-                n_gpu_layers=0,        # Si tu veux tout sur CPU. Sinon adapte.
-                seed=42,
-                use_mmap=True,         # Chargement mémoire optimisé
-                use_mlock=True,        # Évite le swap (garde en RAM)
-                f16_kv=True,           # Active les clés/valeurs float16 (accélère le modèle)
-                logits_all=False,      # Utile si tu n'as pas besoin de tous les logits
-                verbose=False          # Optionnel : désactive les logs verbeux
-            )
+        self.speech_enabled = True
+        # MySQL (pool partagé) ou SQLite selon config.json ; un backend explicite sert aux benchmarks
+        self.db_manager = storage if storage is not None else create_storage()
+
+        # 🖼️ Processus de génération d'images persistants (démarrés au premier job, un par slot)
+        self.image_workers = [ImageWorkerClient()]
+        self.image_cache = ImageCache()
+        self.image_model_hash = None  # Calculés au premier usage
+        self.image_scheduler = None
+
+        # 🧠 Index sémantique des mémoires, construit en arrière-plan
+        self.memory_index = MemoryIndex()
+        # 💾 Écriture différée : les sauvegardes ne bloquent jamais l'appelant (thread GUI compris)
+        self.memory_writer = MemoryWriteBehind(self.db_manager, on_saved=self.memory_index.add_batch)
+        self.memory_token_budget = 256
+        # Embedder choisi par config.json (section "memory"), chargé hors du thread GUI
+        threading.Thread(target=self.memory_index.build_from, args=(self.db_manager,),
+                         kwargs={"embedder_factory": create_embedder}, daemon=True).start()
+        self.first_interaction = True
 
+    def load_model(self, selected_model: str, on_progress=None):
+        """Bascule sur un autre modèle ; le registre évite de recharger un GGUF déjà en mémoire.
+        Appelable depuis un thread de fond (ModelLoader) : la génération en cours continue sur
+        l'ancien modèle jusqu'à l'échange. Renvoie True si un modèle est prêt."""
+        report = on_progress or (lambda message: None)
+        model_path = self.model_paths.get(selected_model)
+        if not model_path or not os.path.exists(model_path):
+            raise FileNotFoundError(f"Modèle introuvable : {model_path}")
+        if model_path == self.model_path and self.model is not None:
+            return True
+
+        report(f"Chargement de {selected_model}...")
+        # Un modèle déjà présent dans le registre a ses pages en mémoire : pas de préchauffage
+        warmup = None
+        if self.warmup_enabled and not self.registry.is_loaded(model_path, **LLAMA_PARAMS):
+            warmup = ModelWarmup(model_path)
+            warmup.start_prefetch()  # Lecture anticipée pendant la construction du modèle
+        try:
+            model = self.registry.acquire(model_path, **LLAMA_PARAMS)
         except Exception as e:
-            self.error_handler.handle_error(e, context="Chargement du modèle", user_message="Erreur lors du chargement du modèle")
-            self.model = None
-
-        self.engine = pyttsx3.init()
-        voices = self.engine.getProperty('voices')
-        for voice in voices:
-            if "french" in voice.name.lower():
-                self.engine.setProperty('voice', voice.id)
-                break
+            if warmup is not None:
+                warmup.stop()
+            self.error_handler.handle_error(e, context="Chargement du modèle", show_dialog=False)
+            return False
 
-        self.speech_enabled = True
-        self.db_manager = MySQLManager("localhost", "root", "JOJOJOJO88", "ia_alice")
-        self.first_interaction = True
+        if warmup is not None:
+            report("Préchauffage du modèle...")
+            try:
+                # Le nouveau modèle n'est pas encore utilisé : l'ancien continue de répondre
+                self.last_warmup = warmup.run(model)
+            except Exception as e:
+                self.error_handler.handle_error(e, context="Préchauffage du modèle", show_dialog=False)
+
+        with self.generation_lock:
+            previous_model = self.model
+            self.model = model
+            self.model_path = model_path
+            self.selected_model = selected_model
+            self.kv_owner = None  # Les états KV sauvegardés ne valent que pour l'ancien modèle
+            if previous_model is not None:
+                self.registry.release(previous_model)
+
+            report("Préparation des préambules...")
+            self.prefix_states = {}
+            self.prime_prefixes()
+        self.model_ready.set()
+        return True
 
     def set_speech_enabled(self, enabled: bool):
         self.speech_enabled = enabled
+        if not enabled:
+            self.tts.interrupt()
 
     def speak(self, text: str):
+        """Met le texte en file de lecture (non bloquant), phrase par phrase."""
         if self.speech_enabled and text.strip():
-            try:
-                self.engine.say(text)
-                self.engine.runAndWait()
-            except Exception as e:
-                self.error_handler.handle_error(e, context="Synthèse vocale", user_message="Erreur vocale")
+            self.tts.say(text)
+
+    def speak_token(self, token: str):
+        """Réponse en streaming : chaque phrase est lue dès qu'elle est complète."""
+        if self.speech_enabled:
+            self.tts.feed(token)
+
+    def end_speech(self):
+        """Fin d'une réponse en streaming : lit la dernière phrase incomplète."""
+        self.tts.flush()
+
+    def stop_speaking(self):
+        self.tts.interrupt()
+
+    def reset_session(self):
+        """Démarre une nouvelle conversation (historique et cache KV oubliés)."""
+        with self.generation_lock:
+            if self.kv_owner is self.session:
+                self.kv_owner = None
+            self.session = ConversationSession()
+
+    def claim_kv(self, owner, prefix=None):
+        """Réserve le cache KV du modèle pour une session (ou None pour un prompt isolé).
+
+        L'état de la session précédente est sauvegardé pour être restauré à son prochain tour ;
+        llama.cpp ne réévalue ensuite que les tokens qui suivent le préfixe commun.
+        Sans état propre, on repart de l'état préévalué du préfixe s'il est connu.
+        """
+        if owner is not None and self.kv_owner is owner:
+            return
+        if isinstance(self.kv_owner, ConversationSession):
+            self.kv_owner.state = self.model.save_state()
+            self.kv_owner.state_model = self.model
+        if owner is not None and owner.state is not None and owner.state_model is self.model:
+            self.model.load_state(owner.state)
+        elif prefix in self.prefix_states:
+            self.model.load_state(self.prefix_states[prefix])
+        self.kv_owner = owner
+
+    def prime_prefixes(self):
+        """Prépare l'état KV des préambules fixes, depuis le cache disque si possible."""
+        if not self.model:
+            return
+        with self.generation_lock:
+            for prefix in (CODE_PROMPT_PREFIX, SYSTEM_PROMPT):
+                try:
+                    self.prime_prefix(prefix)
+                except Exception as e:
+                    self.error_handler.handle_error(e, context="Préparation du préambule", show_dialog=False)
+            # Le dernier préfixe évalué (préambule système) reste dans le cache KV
+            self.kv_owner = None
+
+    def prime_prefix(self, prefix: str):
+        start = time.perf_counter()
+        key = self.prompt_cache.make_key(self.model_path, LLAMA_PARAMS, prefix)
+        state = self.prompt_cache.get(key)
+        if state is not None:
+            self.model.load_state(state)
+            origin = "cache disque"
+        else:
+            self.model.reset()
+            self.model.eval(self.model.tokenize(prefix.encode("utf-8")))
+            state = self.model.save_state()
+            self.prompt_cache.put(key, state)
+            origin = "évaluation"
+        self.prefix_states[prefix] = state
+        print(f"[INFO] Préambule prêt ({origin}) en {time.perf_counter() - start:.2f}s")
+
+    def retrieve_memories(self, query: str, k: int = 3) -> str:
+        """Sélectionne les souvenirs les plus proches de la requête dans la limite du budget de tokens."""
+        lines = []
+        used_tokens = 0
+        for score, prompt, response in self.memory_index.search(query, k=k):
+            line = f"- Utilisateur : {prompt} / Alice : {response}\n"
+            cost = len(self.model.tokenize(line.encode("utf-8"), add_bos=False))
+            if used_tokens + cost > self.memory_token_budget:
+                break
+            lines.append(line)
+            used_tokens += cost
+        if not lines:
+            return ""
+        return "Souvenirs utiles :\n" + "".join(lines)
+
+    def cancel_generation(self):
+        """Interrompt la génération LLM en cours (au plus un token plus tard) ; les requêtes en file continuent."""
+        token = self.active_cancel_token
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def generate_stream(self, prompt: str, session=None, cancel_token=None, deadline=None):
+        """Génère la réponse token par token (générateur de fragments de texte).
+        cancel_token / deadline (secondes) permettent d'arrêter le décodage ; le texte déjà produit est conservé."""
+        if not self.model:
+            yield "[ERREUR] Modèle non initialisé."
+            return
+        prompt = prompt.strip()
+        if not prompt:
+            yield "[ERREUR] Prompt vide."
+            return
 
-    def generate(self, prompt: str) -> str:
+        session = session or self.session
+        should_save = "#save" in prompt
+        cleaned_prompt = prompt.replace("#save", "").strip()
+        max_tokens = 400
+
+        cancel_token = cancel_token or CancellationToken(deadline)
+        answer = ""
+        with self.generation_lock:
+            if cancel_token.cancelled:  # Annulée pendant l'attente du modèle
+                return
+            self.active_cancel_token = cancel_token
+            try:
+                self.claim_kv(session, prefix=session.system_prompt)
+                memories = self.retrieve_memories(cleaned_prompt)
+                session.trim(self.model, max_tokens + self.memory_token_budget)
+                final_prompt = session.build_prompt(cleaned_prompt, context=memories)
+
+                stream = self.model.create_completion(
+                    prompt=final_prompt,
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    top_p=0.9,
+                    stop=["\nUtilisateur:", "\nAlice:", "\n"],
+                    stopping_criteria=cancel_token.stopping_criteria(),
+                    stream=True
+                )
+
+                for chunk in stream:
+                    if not chunk.get("choices"):
+                        continue
+                    token = chunk["choices"][0].get("text", "")
+                    if not answer:
+                        token = token.lstrip()  # Espaces de tête ignorés comme avec strip()
+                    if not token:
+                        continue
+                    answer += token
+                    yield token
+            finally:
+                self.active_cancel_token = None
+
+            if answer.strip():
+                session.append(cleaned_prompt, answer.strip(), context=memories)
+
+        if cancel_token.cancelled:
+            print(f"[GÉNÉRATION] Interrompue ({cancel_token.reason}) après {len(answer)} caractères.")
+            return
+
+        if should_save and len(answer.split()) >= 2:
+            self.save_to_memory(cleaned_prompt, answer.strip())
+
+    def generate(self, prompt: str, on_token=None, cancel_token=None, deadline=None) -> str:
+        """Génère une réponse complète. Si on_token est fourni, il reçoit chaque token dès sa production.
+        Une génération annulée (cancel_token, deadline) renvoie le texte partiel."""
         if not self.model:
             return "[ERREUR] Modèle non initialisé."
         prompt = prompt.strip()
         if not prompt:
             return "[ERREUR] Prompt vide."
 
-        should_save = "#save" in prompt
-        cleaned_prompt = prompt.replace("#save", "").strip()
+        try:
+            cancel_token = cancel_token or CancellationToken(deadline)
+            answer = ""
+            for token in self.generate_stream(prompt, cancel_token=cancel_token):
+                answer += token
+                if on_token:
+                    on_token(token)
+            answer = answer.strip()
 
-        final_prompt = (
-            "Tu es une IA qui parle exclusivement en français.\n"
-            "Réponds toujours de façon claire et concise.\n"
-            f"Utilisateur : {cleaned_prompt}\nAlice :"
-        )
+            if cancel_token.cancelled:
+                return answer or "[ANNULÉ] Génération interrompue."
 
-        try:
-            result = self.model.create_completion(
-                prompt=final_prompt,
-                max_tokens=400,
-                temperature=0.7,
-                top_p=0.9,
-                stop=["\nUtilisateur:", "\nAlice:", "\n"]
-            )
-            if isinstance(result, dict) and "choices" in result and result["choices"]:
-                answer = result["choices"][0]["text"].strip()
-            else:
-                answer = "[ERREUR] Réponse invalide."
+            if not answer:
+                return "[ERREUR] Réponse invalide."
 
-            if not answer or len(answer.split()) < 2:
+            if len(answer.split()) < 2:
                 return "[ERREUR] Réponse trop courte ou vide."
 
-            if should_save:
-                self.save_to_memory(cleaned_prompt, answer)
-
             return answer
         except Exception as e:
             self.error_handler.handle_error(e, context="Génération texte", user_message="Erreur génération de texte")
             return "[ERREUR] Erreur interne lors de la génération."
 
-    def generate_code(self, user_request: str, language: str = "Python") -> str:
+    def generate_code(self, user_request: str, language: str = "Python", use_cache: bool = True,
+                      cancel_token=None, deadline=None) -> str:
+        """Génère un bloc de code. use_cache=False force une nouvelle inférence (le résultat est tout de même mis en cache).
+        Un code interrompu (cancel_token, deadline) est renvoyé tel quel mais jamais mis en cache."""
         try:
-            prompt = f"""Tu es un assistant expert en programmation. 
-            Ne retourne que du code. Ne mets aucune explication. Réponds uniquement avec un bloc de code Markdown.
+            cancel_token = cancel_token or CancellationToken(deadline)
+            cleaned_request = user_request.replace("#save", "").strip()
+            sampling = CODE_SAMPLING_PARAMS
+            cache_key = self.response_cache.make_key(
+                self.prompt_cache.model_fingerprint(self.model_path), cleaned_request, language, sampling
+            )
 
-            ### Question
-            {user_request.strip()}
+            code = self.response_cache.get(cache_key) if use_cache else None
+            if use_cache:
+                print(f"[CACHE] Réponse code {'trouvée' if code else 'absente'} — {self.response_cache.stats()}")
+
+            if code is None:
+                prompt = CODE_PROMPT_PREFIX + f"""{cleaned_request}
 
             ### Réponse
             ```{language.lower()}
             """
 
-            response = self.model.create_completion(
-                prompt=prompt,
-                max_tokens=400,
-                temperature=0.1,
-                top_p=1.0,
-                stop=["```"]
-            )
+                with self.generation_lock:
+                    if cancel_token.cancelled:
+                        return "[ANNULÉ] Génération de code interrompue."
+                    self.active_cancel_token = cancel_token
+                    try:
+                        # Prompt isolé : l'état de la conversation est mis de côté
+                        self.claim_kv(None, prefix=CODE_PROMPT_PREFIX)
+                        response = self.model.create_completion(
+                            prompt=prompt,
+                            stop=["```"],
+                            stopping_criteria=cancel_token.stopping_criteria(),
+                            **sampling
+                        )
+                    finally:
+                        self.active_cancel_token = None
+
+                if not ("choices" in response and response["choices"]):
+                    return "[ERREUR] Réponse invalide"
 
-            if "choices" in response and response["choices"]:
                 code = response["choices"][0]["text"].strip()
                 if not code:
-                    return "[ERREUR] Code vide ou invalide"
+                    return "[ANNULÉ] Génération de code interrompue." if cancel_token.cancelled else "[ERREUR] Code vide ou invalide"
                 if not code.startswith("```"):
                     code = f"```{language.lower()}\n{code}\n```"
+                if cancel_token.cancelled:
+                    print(f"[GÉNÉRATION] Code interrompu ({cancel_token.reason}), non mis en cache.")
+                else:
+                    self.response_cache.put(cache_key, code)
 
-                if "#save" in user_request:
-                    self.save_to_memory(user_request.replace("#save", "").strip(), code)
+            if "#save" in user_request and not cancel_token.cancelled:
+                self.save_to_memory(cleaned_request, code)
 
-                return code
-
-            return "[ERREUR] Réponse invalide"
+            return code
 
         except Exception as e:
             self.error_handler.handle_error(e, context="Génération code", user_message="Erreur génération de code")
             return "[ERREUR] Erreur interne lors de la génération de code."
 
-    def generate_image(self, prompt: str) -> str:
+    def get_image_worker(self, slot: int = 0) -> ImageWorkerClient:
+        while len(self.image_workers) <= slot:
+            self.image_workers.append(ImageWorkerClient())
+        return self.image_workers[slot]
+
+    def image_cache_key(self, prompt: str, settings: dict) -> str:
+        if self.image_model_hash is None:
+            self.image_model_hash = image_model_fingerprint(IMAGE_MODEL_DIR)
+            self.image_scheduler = image_scheduler_name(IMAGE_MODEL_DIR)
+        return ImageCache.make_key(
+            prompt, settings["seed"], settings["steps"], settings["width"], settings["height"],
+            self.image_scheduler, self.image_model_hash
+        )
+
+    def cached_image(self, prompt: str, **options):
+        """Chemin de l'image déjà générée pour ce prompt et ces réglages, sinon None (lecture d'index, sans attente)."""
+        settings = dict(IMAGE_DEFAULT_OPTIONS, **options)
+        cached_path = self.image_cache.get(self.image_cache_key(prompt, settings))
+        if cached_path:
+            print(f"[CACHE] Image déjà générée : {cached_path} (hits={self.image_cache.hits}, misses={self.image_cache.misses})")
+        return cached_path
+
+    def generate_image(self, prompt: str, on_progress=None, cancel_event=None, slot: int = 0,
+                       force_new: bool = False, **options) -> str:
+        """Génère (ou retrouve dans le cache) une image. force_new tire une nouvelle graine : nouvelle variation."""
         try:
-            print("[INFO] Lancement de la génération via subprocess")
-            script_path = os.path.abspath("imagesManager/generate.py")
-
-            output = subprocess.check_output(
-                ["python", script_path, "--prompt", prompt],
-                stderr=subprocess.STDOUT,
-                text=True,
-                timeout=120
+            settings = dict(IMAGE_DEFAULT_OPTIONS, **options)
+            if force_new:
+                settings["seed"] = random.randrange(2 ** 31)
+            cache_key = self.image_cache_key(prompt, settings)
+
+            if not force_new:
+                cached_path = self.image_cache.get(cache_key)
+                if cached_path:
+                    print(f"[CACHE] Image déjà générée : {cached_path} (hits={self.image_cache.hits}, misses={self.image_cache.misses})")
+                    return f"[Image générée] #image {cached_path}"
+
+            print("[INFO] Envoi de la génération au worker image")
+            result = self.get_image_worker(slot).generate(
+                prompt, on_progress=on_progress, cancel_event=cancel_event, output_dir=IMAGE_OUTPUT_DIR, **settings
             )
 
-            for line in output.splitlines():
+            for line in result.splitlines():
                 if "#image" in line:
+                    self.image_cache.put(cache_key, line.split("#image")[-1].strip(), prompt)
                     return line.strip()
 
+            print(f"[ERREUR] Worker image : {result}")
             return "[ERREUR] Aucune image générée."
 
-        except subprocess.TimeoutExpired as e:
+        except ImageJobCancelled:
+            return "[ANNULÉ] Génération d'image annulée."
+
+        except TimeoutError as e:
             self.error_handler.handle_error(e, context="Génération image", user_message="Timeout génération image")
             return "[ERREUR] Timeout de génération."
 
-        except subprocess.CalledProcessError as e:
-            self.error_handler.handle_error(e, context="Génération image", user_message=f"Erreur subprocess : {e.output}")
+        except RuntimeError as e:
+            self.error_handler.handle_error(e, context="Génération image", user_message=f"Erreur worker image : {e}")
             return "[ERREUR] Génération échouée."
 
         except Exception as e:
             self.error_handler.handle_error(e, context="Génération image", user_message="Erreur interne génération image")
             return "[ERREUR] Exception interne."
 
-    def save_to_memory(self, prompt: str, response: str):
+    def shutdown(self):
+        """Libère les ressources externes de l'agent (processus d'images, écritures en attente)."""
+        for worker in self.image_workers:
+            worker.shutdown()
+        self.memory_writer.close()
+        self.tts.shutdown()
+
+    def save_to_memory(self, prompt: str, response: str, force=False):
         try:
-            if len(prompt) < 15 or len(response) < 5:
-                return  # filtre basique
-            self.db_manager.save_memory(prompt, response)
+            if not force and (len(prompt) < 15 or len(response) < 5):
+                return  # filtre basique (ignoré pour une sauvegarde demandée explicitement)
+            self.memory_writer.save(prompt, response)  # Indexée une fois écrite (on_saved)
         except Exception as e:
             self.error_handler.handle_error(e, context="Sauvegarde mémoire", user_message="Erreur sauvegarde mémoire")
 
@@ -1,13 +1,10 @@
 import os
 import json
 import time
-import psutil 
-import pyttsx3
-import speech_recognition as sr
+import threading
 import pyperclip
 import re
 from html import escape
-from queue import Queue
 
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QMutex, QThreadPool, QRunnable, QTimer, QMetaObject, Q_ARG, pyqtSlot, QSize
 from PyQt5.QtWidgets import (
@@ -16,16 +13,17 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QPixmap, QTextCursor, QPalette, QColor, QFont, QMovie
 
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name
-from pygments.formatters import HtmlFormatter
 from codeManager.codeManager import codeManager
-from imagesManager.image_manager import Image_Manager
+from imagesManager.image_manager import Image_Manager, ImageViewer
 from interfaceManager.interface_manager import InterfaceManager
 from gestionnaire_ressources.resource_manager import IAResourceManager
-from llama_cpp_agent import LlamaCppAgent
+from modelManager.model_loader import ModelLoader
+from reconnaissance_vocale.recognizers import create_recognizer
+from reconnaissance_vocale.capture import EnergyVAD, WakeWordDetector
+from utils.lazy_import import lazy_import
 
-from diffusers import StableDiffusionPipeline
+# Micro (PyAudio) chargé seulement quand la reconnaissance vocale démarre
+sr = lazy_import("speech_recognition")
 
 try:
     from PyQt5.QtCore import qRegisterMetaType
@@ -54,77 +52,137 @@ class InputTextEdit(QTextEdit):
         else:
             super().keyPressEvent(event)
 class VoiceRecognitionThread(QThread):
+    """Capture micro pilotée par les événements : lecture bloquante des trames, VAD par énergie,
+    puis mot d'éveil « Alice » local. Seuls les énoncés qui commencent par le mot d'éveil
+    (ou qui suivent un « Alice » seul) sont envoyés au moteur de reconnaissance."""
+
     result_signal = pyqtSignal(str)
+    partial_signal = pyqtSignal(str)  # Hypothèse partielle pendant que l'utilisateur parle
 
-    def __init__(self, images):
+    def __init__(self, images, config=None, frame_ms=30, wake_window=8.0):
         super().__init__()
         self.images = images
+        self.config = config if config is not None else load_config()
+        self.frame_ms = frame_ms
+        self.wake_window = wake_window  # Secondes d'écoute après un « Alice » prononcé seul
+        self.backend = None        # Créés dans le thread : le chargement du modèle Vosk ne fige pas l'interface
+        self.wake_detector = None
         self.running = True
-        self.is_paused = False
-        self.is_processing_response = False
-        self.mutex = QMutex()
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone(device_index=1)
-        self.last_active_time = time.time()
-        self.max_inactive_duration = 30
+        self.active = threading.Event()  # Effacé = en pause : le thread dort sans se réveiller
+        self.active.set()
+        self.armed_until = 0.0
+        self.segment = bytearray()
+        self.woken = False
+        self.finals = []
+        self.last_partial = ""
 
     def run(self):
-        with self.microphone as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        self.backend = create_recognizer(self.config)
+        model = getattr(self.backend, "model", None)
+        if model is not None:
+            self.wake_detector = WakeWordDetector(model, self.backend.sample_rate)
+        vad = EnergyVAD(self.backend.sample_rate, frame_ms=self.frame_ms)
+        block = vad.frame_len * 3
+
+        with sr.Microphone(device_index=1, sample_rate=self.backend.sample_rate, chunk_size=block) as source:
             while self.running:
-                self.mutex.lock()
-                paused = self.is_paused
-                self.mutex.unlock()
-
-                if paused:
-                    time.sleep(0.5)
-                    continue
-
-                if time.time() - self.last_active_time > self.max_inactive_duration:
-                    self.pause()
+                if not self.active.is_set():
+                    self.active.wait()
+                    vad.reset()
+                    self.reset_segment()
                     continue
-
                 try:
-                    try:
-                        audio = self.recognizer.listen(source, timeout=10)
-                    except sr.WaitTimeoutError:
-                        continue  # Aucun son détecté dans le délai imparti
-
-                    if self.is_paused:
-                        continue
-
-                    text = self.recognizer.recognize_google(audio, language="fr-FR")
-                    self.last_active_time = time.time()
+                    data = source.stream.read(block)  # Bloquant : aucun sondage actif
+                    for kind, audio in vad.process(data):
+                        if kind == "start":
+                            self.start_segment(audio)
+                        elif kind == "audio":
+                            self.feed_segment(audio)
+                        else:
+                            self.end_segment()
+                except Exception as e:
+                    print(f"[VOIX] Erreur de reconnaissance : {e}")
+                    self.reset_segment()
+
+    def reset_segment(self):
+        self.segment = bytearray()
+        self.woken = False
+        self.finals = []
+        if self.last_partial:
+            self.last_partial = ""
+            self.partial_signal.emit("")  # Fin de dictée : l'aperçu disparaît
+
+    def start_segment(self, audio):
+        self.reset_segment()
+        self.woken = time.time() < self.armed_until
+        self.backend.reset()
+        if self.wake_detector is not None:
+            self.wake_detector.reset()
+        self.feed_segment(audio)
+
+    def feed_segment(self, audio):
+        self.segment.extend(audio)
+        if self.woken:
+            self.recognize(audio)
+        elif self.wake_detector is not None and self.wake_detector.accept_audio(audio):
+            # Mot d'éveil entendu : le moteur complet reçoit l'énoncé depuis son début
+            self.woken = True
+            self.recognize(bytes(self.segment))
+
+    def recognize(self, audio):
+        final, text = self.backend.accept_audio(audio)
+        if final:
+            self.finals.append(text)
+        elif text and text != self.last_partial:
+            self.last_partial = text
+            self.partial_signal.emit(text)
+
+    def end_segment(self):
+        if self.woken:
+            text = " ".join(part for part in self.finals + [self.backend.finish()] if part)
+        elif self.wake_detector is None:
+            # Pas de détecteur local : l'énoncé entier est transcrit puis filtré sur « alice »
+            text = self.backend.transcribe(bytes(self.segment))
+        else:
+            text = ""  # Pas de mot d'éveil : le moteur de reconnaissance n'est jamais sollicité
+        woken = self.woken
+        self.reset_segment()
+        if text:
+            self.handle_text(text, woken)
+
+    def handle_text(self, text, woken=False):
+        text_strip = text.strip()
+        text_lower = text_strip.lower()
+
+        # On ne traite que les énoncés passés par le mot d'éveil (ou contenant "alice")
+        if not woken and "alice" not in text_lower:
+            return
 
-                    text_strip = text.strip()
-                    text_lower = text_strip.lower()
+        # Si commence par "alice", on retire juste "alice" au début
+        if text_lower.startswith("alice"):
+            cleaned_text = text_strip[len("alice"):].lstrip(" ,")
+        else:
+            cleaned_text = text_strip
 
-                    # On ne traite que si "alice" est dans la phrase
-                    if "alice" in text_lower:
-                        # Si commence par "alice", on retire juste "alice" au début
-                        if text_lower.startswith("alice"):
-                            cleaned_text = text_strip[len("alice"):].lstrip()
-                        else:
-                            cleaned_text = text_strip  # sinon phrase complète
+        if not cleaned_text:
+            # « Alice » seul : la prochaine phrase est écoutée sans mot d'éveil
+            self.armed_until = time.time() + self.wake_window
+            self.last_partial = "Je t'écoute"
+            self.partial_signal.emit(self.last_partial)
+            return
 
-                        if cleaned_text:
-                            self.is_processing_response = True
-                            self.result_signal.emit(cleaned_text)
-                except Exception as e:
-                    # Tu peux logger l'erreur ici si tu veux
-                    pass
-                finally:
-                    self.is_processing_response = False
+        self.armed_until = 0.0
+        self.result_signal.emit(cleaned_text)
 
     def pause(self):
-        self.is_paused = True
+        self.active.clear()
 
     def resume(self):
-        self.is_paused = False
-        self.last_active_time = time.time()
+        self.active.set()
 
     def stop(self):
         self.running = False
+        self.active.set()
         self.quit()
         self.wait()
 
@@ -162,8 +220,9 @@ class MainWindow(QWidget):
 
         # 🎤 Initialisation du thread de reconnaissance vocale
         self.voice_input_enabled = self.config.get("voice_enabled", False)
-        self.voice_recognition_thread = VoiceRecognitionThread(self.images)
+        self.voice_recognition_thread = VoiceRecognitionThread(self.images, self.config)
         self.voice_recognition_thread.result_signal.connect(self.on_text_recognized)
+        self.voice_recognition_thread.partial_signal.connect(self.on_partial_recognized)
         self.is_user_speaking = True
 
         # 🚀 Lance automatiquement la reconnaissance si activée dans la config
@@ -171,7 +230,8 @@ class MainWindow(QWidget):
             self.voice_recognition_thread.start()
 
 
-        self.llama_agent = LlamaCppAgent(self.model_paths)
+        # L'agent créé par app.py est partagé : le modèle n'est chargé qu'une fois
+        self.llama_agent = self.images
         self.codeManager = codeManager(parent=self, agent=self.llama_agent)
         self.image_manager = Image_Manager(parent=self, agent=self.llama_agent)
 
@@ -190,6 +250,16 @@ class MainWindow(QWidget):
         )
         self.resource_manager.overload_signal.connect(self.handle_resource_overload)
         self.resource_manager.ready_signal.connect(self.handle_resource_ready)
+        self.resource_manager.scheduler.job_started.connect(self.on_scheduled_job_started)
+        self.resource_manager.scheduler.job_queued.connect(self.update_stop_button)
+        self.resource_manager.scheduler.job_finished.connect(self.update_stop_button)
+
+        # Chargement du modèle en arrière-plan : la fenêtre s'affiche sans attendre le GGUF
+        self.model_loader = ModelLoader(self.images, self.resource_manager.scheduler)
+        self.model_loader.loading_started.connect(self.on_model_loading_started)
+        self.model_loader.loading_progress.connect(self.set_waiting_message)
+        self.model_loader.loading_finished.connect(self.on_model_loaded)
+        self.model_loader.loading_failed.connect(self.on_model_load_failed)
 
         # Ajout : ajustement dynamique du seuil mémoire à 60% RAM dispo
         self.adjust_memory_threshold()
@@ -199,6 +269,11 @@ class MainWindow(QWidget):
         self.interface = InterfaceManager(self)
         self.last_response = ""  # 🔐 Pour initialiser
         self.last_prompt = ""  # 🧠 Pour #save
+        self.streaming_row = None  # 💬 Ligne du message d'Alice en cours de génération
+        self.streaming_text = ""
+
+        if self.images.model is None:
+            self.model_loader.load(self.images.selected_model)
 
     def toggle_voice(self, state):
         self.config["voice_enabled"] = bool(state)
@@ -210,8 +285,9 @@ class MainWindow(QWidget):
             self.voice_button.setText("🎤 Micro: ON")
             self.voice_button.setStyleSheet("background-color: lightgreen; font-weight: bold;")
             if not self.voice_recognition_thread.isRunning():
-                self.voice_recognition_thread = VoiceRecognitionThread(self.images)
+                self.voice_recognition_thread = VoiceRecognitionThread(self.images, self.config)
                 self.voice_recognition_thread.result_signal.connect(self.on_text_recognized)
+                self.voice_recognition_thread.partial_signal.connect(self.on_partial_recognized)
                 self.voice_recognition_thread.start()
             else:
                 self.voice_recognition_thread.resume()
@@ -224,16 +300,45 @@ class MainWindow(QWidget):
     def load_model(self, model_name):
         self.config["last_model"] = model_name
         save_config(self.config)
-        try:
-            self.images = LlamaCppAgent(self.model_paths, selected_model=model_name)
-            self.voice_recognition_thread.images = self.images
-        except Exception as e:
-            print(f"[ERREUR CHARGEMENT MODÈLE] : {e}")
+        # Le registre rend le changement instantané si le modèle est déjà en mémoire
+        self.model_loader.load(model_name)
+
+    def on_model_loading_started(self, model_name):
+        self.model_selector.setEnabled(False)
+        self.set_waiting_message(f"Chargement du modèle {model_name}...")
+
+    def on_model_loaded(self, model_name, elapsed):
+        self.model_selector.setEnabled(True)
+        # Le GGUF mappé occupe désormais la RAM : seuil recalculé, sinon chaque requête "llm" resterait en attente
+        self.adjust_memory_threshold()
+        self.set_waiting_message(f"Modèle {model_name} prêt ({elapsed:.1f}s)")
+        QTimer.singleShot(1500, self.clear_waiting_if_idle)
+
+    def on_model_load_failed(self, model_name, error):
+        self.model_selector.setEnabled(True)
+        self.clear_waiting_message()
+        # Le sélecteur revient sur le modèle réellement chargé
+        self.model_selector.blockSignals(True)
+        self.model_selector.setCurrentText(self.images.selected_model)
+        self.model_selector.blockSignals(False)
+        self.afficher_erreur(f"Chargement du modèle {model_name} impossible : {error}")
+
+    def clear_waiting_if_idle(self):
+        if self.resource_manager.scheduler.running_count("llm") == 0:
+            self.clear_waiting_message()
+
+    def on_partial_recognized(self, text):
+        # Retour visuel immédiat pendant la dictée ; texte vide = fin de l'énoncé
+        if text:
+            self.waiting_label.setText(f"🎤 {escape(text)}...")
+            self.waiting_container.setVisible(True)
+        elif self.waiting_label.text().startswith("🎤"):
+            self.waiting_container.setVisible(False)
 
     def on_text_recognized(self, text):
         print("[DEBUG] Texte brut reconnu :", text)
         if self.is_user_speaking:
-            self.scroll_layout.addWidget(StyledLabel(f"<b style='color: lightblue'>[Vous]</b> {text}"))
+            self.transcript.add_text(f"<b style='color: lightblue'>[Vous]</b> {escape(text)}")
 
             self.is_user_speaking = False
             self.voice_recognition_thread.pause()
@@ -264,11 +369,39 @@ class MainWindow(QWidget):
         print("[DEBUG] >>> Appel de generate_model_response() avec :", prompt)
 
         self.last_prompt = prompt  # 🧠 Mémorise le prompt pour #save
-        self.try_run_ia(prompt)
+
+        # Soumet la tâche à l'ordonnanceur : elle attend son tour si une génération est déjà en cours
+        job_id = self.resource_manager.submit(self.make_generation_task(prompt), job_class="llm")
+        if not job_id:
+            self.clear_waiting_message()
+            self.transcript.add_text("<span style='color:red'>[!] Trop de demandes en attente, réessayez dans un instant.</span>")
+            print("[INFO] Requête refusée: file d'attente pleine")
+        elif self.model_loader.loading:
+            self.set_waiting_message("Modèle en cours de chargement, votre demande partira dès qu'il sera prêt...")
+        elif self.resource_manager.scheduler.position(job_id) > 1:
+            self.set_waiting_message(f"En file d'attente (position {self.resource_manager.scheduler.position(job_id)})...")
+
+    def make_generation_task(self, prompt):
+        # Lu ici (thread principal) : la tâche tourne dans un thread de l'ordonnanceur
+        speak = self.voice_checkbox.isChecked()
+
+        def on_token(token):
+            # Lecture vocale phrase par phrase pendant la génération
+            if speak:
+                self.images.speak_token(token)
+            # Chaque token est transmis au thread principal dès sa génération
+            QMetaObject.invokeMethod(
+                self,
+                "append_model_token",
+                Qt.QueuedConnection,
+                Q_ARG(str, token)
+            )
 
         def run():
-            response = self.images.generate(prompt)
+            response = self.images.generate(prompt, on_token=on_token)
             print("[DEBUG] Réponse brute :", response)
+            if speak:
+                self.images.end_speech()
 
             # Passage au thread principal pour mise à jour UI
             QMetaObject.invokeMethod(
@@ -278,12 +411,23 @@ class MainWindow(QWidget):
                 Q_ARG(str, response)
             )
 
-        # Soumet la tâche au gestionnaire de ressources
-        if not self.resource_manager.submit(run):
+        return run
+
+    @pyqtSlot(str)
+    def append_model_token(self, token):
+        # Premier token : on remplace le spinner par le message d'Alice
+        if self.streaming_row is None:
             self.clear_waiting_message()
-            self.scroll_layout.addWidget(StyledLabel("<span style='color:red'>[!] Trop de charge système, réessayez plus tard.</span>"))
-            print("[INFO] Requête refusée: surcharge CPU ou RAM")
+            self.spinner_label.setVisible(False)
+            self.streaming_text = ""
+            self.streaming_row = self.transcript.add_text("")
+
+        self.streaming_text += token
+        self.transcript.update_text(self.streaming_row, self.format_alice_message(self.streaming_text))
+        QTimer.singleShot(0, self.transcript_view.scrollToBottom)
 
+    def format_alice_message(self, text):
+        return f"<b style='color: lightgreen'>[Alice]</b> <span style='color: white;'>{escape(text)}</span>"
 
     @pyqtSlot(str)
     def display_model_response(self, response):
@@ -295,12 +439,18 @@ class MainWindow(QWidget):
         # 🔐 Sauvegarder les derniers prompt/réponse
         self.last_response = response.strip()
 
-        label = StyledLabel(f"<b style='color: lightgreen'>[Alice]</b> <span style='color: white;'>{escape(response)}</span>")
-        self.scroll_layout.addWidget(label)
-        QTimer.singleShot(100, lambda: self.scroll_area.verticalScrollBar().setValue(
-            self.scroll_area.verticalScrollBar().maximum()))
+        # Le message affiché en streaming reçoit le texte final (ou l'erreur éventuelle)
+        streamed = self.streaming_row is not None
+        if streamed:
+            self.transcript.update_text(self.streaming_row, self.format_alice_message(response))
+            self.streaming_row = None
+            self.streaming_text = ""
+        else:
+            self.transcript.add_text(self.format_alice_message(response))
+        QTimer.singleShot(100, self.transcript_view.scrollToBottom)
 
-        if self.voice_checkbox.isChecked():
+        # Réponse déjà lue au fil du streaming ; sans token reçu (erreur), on lit le message ici
+        if self.voice_checkbox.isChecked() and not streamed:
             self.images.speak(response)
 
         # ✅ Sauvegarde automatique si #save dans le prompt
@@ -329,10 +479,8 @@ class MainWindow(QWidget):
         self.last_prompt = text
 
         # Affichage du message utilisateur dans l'UI
-        user_label = StyledLabel(f"<b style='color: lightblue'>[Vous]</b> {escape(text)}")
-        self.scroll_layout.addWidget(user_label)
-        QTimer.singleShot(100, lambda: self.scroll_area.verticalScrollBar().setValue(
-            self.scroll_area.verticalScrollBar().maximum()))
+        self.transcript.add_text(f"<b style='color: lightblue'>[Vous]</b> {escape(text)}")
+        QTimer.singleShot(100, self.transcript_view.scrollToBottom)
         self.last_prompt = text  # 🧠 Stocke le prompt avant de vider
         self.input_box.clear()
 
@@ -358,15 +506,13 @@ class MainWindow(QWidget):
         print("Réponse :", response)
 
         if not prompt or not response:
-            self.scroll_layout.addWidget(StyledLabel("<span style='color:red'>[!] Aucune réponse à sauvegarder.</span>"))
+            self.transcript.add_text("<span style='color:red'>[!] Aucune réponse à sauvegarder.</span>")
             return
 
-        from memoireManager.memory_window import MemoryViewer
-        mem = MemoryViewer(memory_data=None)
-        mem.save_to_database(prompt, response)
-        mem.close()
+        # Connexion empruntée au pool partagé, index sémantique tenu à jour
+        self.images.save_to_memory(prompt, response, force=True)
 
-        self.scroll_layout.addWidget(StyledLabel("<span style='color: lightgreen'>[✔] Interaction sauvegardée.</span>"))
+        self.transcript.add_text("<span style='color: lightgreen'>[✔] Interaction sauvegardée.</span>")
 
 
 
@@ -375,8 +521,40 @@ class MainWindow(QWidget):
         self.mem_window = MemoryViewer(self.images, style_sheet=self.styleSheet())  # <-- garde une référence
         self.mem_window.show()
 
+    def show_image(self, image_path):
+        ImageViewer(image_path, self).exec_()
+
+    def new_conversation(self):
+        # 🆕 Le modèle oublie l'historique et le fil repart de zéro (bouton actif seulement au repos)
+        self.images.reset_session()
+        self.transcript.clear()
+        self.streaming_row = None
+        self.streaming_text = ""
+        self.last_prompt = ""
+        self.last_response = ""
+        self.save_button.setEnabled(False)
+
+    def stop_generation(self):
+        # ⏹ Interrompt la génération de texte/code en cours (le texte partiel est conservé)
+        # et annule les générations d'images ; les requêtes texte en file démarrent aussitôt
+        self.images.cancel_generation()
+        self.images.stop_speaking()
+        self.image_manager.cancel_all_jobs()
+
+    def update_stop_button(self, *args):
+        scheduler = self.resource_manager.scheduler
+        # Le chargement du modèle ne s'interrompt pas : il ne compte pas pour le bouton Stop
+        jobs = scheduler.running_count() + scheduler.pending_count() - int(self.model_loader.loading)
+        self.stop_button.setVisible(jobs > 0)
+        # Une réponse en cours arriverait dans le nouveau fil : on attend la fin des tâches
+        self.new_conversation_button.setEnabled(jobs == 0)
+
     def closeEvent(self, event):
         self.voice_recognition_thread.stop()
+        self.transcript.close()
+        if self.image_manager.job_queue is not None:
+            self.image_manager.job_queue.shutdown()
+        self.images.shutdown()
         event.accept()
 
     def copy_last_code(self):
@@ -400,9 +578,6 @@ class MainWindow(QWidget):
         self.waiting_container.setVisible(False)
 
     def add_code_block(self, highlighted_code: str, raw_code: str):
-        container = QWidget()
-        container_layout = QVBoxLayout(container)
-
         # 🔧 Nettoyage du code brut pour éviter les ```python
         clean_code = raw_code.strip()
         if clean_code.startswith("```"):
@@ -413,56 +588,39 @@ class MainWindow(QWidget):
         self.last_response = clean_code  # ✅ Code propre à sauvegarder
         self.last_prompt = self.input_box.toPlainText().strip() or "Code généré"
 
-        code_display = QTextEdit()
-        code_display.setReadOnly(True)
-        code_display.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        code_display.setHtml(f"""
-            <div style="font-family: Consolas; font-size: 13px; line-height: 1.2em; margin:0; padding:0;">
-                {highlighted_code}
-            </div>
-        """)
-
-        container_layout.addWidget(code_display)
-
-        copy_btn = QPushButton("📋 Copier le code")
-        copy_btn.setFixedWidth(150)
-        copy_btn.clicked.connect(lambda: pyperclip.copy(clean_code))
-        copy_btn.setStyleSheet("margin-top: 5px; margin-bottom: 10px;")
-        container_layout.addWidget(copy_btn, alignment=Qt.AlignCenter)
-
-        self.scroll_layout.addWidget(container)
+        # Copie : double-clic ou menu contextuel sur le bloc
+        self.transcript.add_code(highlighted_code, clean_code)
 
 
 
     def afficher_erreur(self, message):
-        self.scroll_layout.addWidget(StyledLabel(
-            f"<span style='color:red'><b>[ERREUR]</b> {message}</span>"
-        ))
-        
+        self.transcript.add_text(f"<span style='color:red'><b>[ERREUR]</b> {message}</span>")
+
         # Scroll automatique vers le bas
-        QTimer.singleShot(0, lambda: self.parent.scroll_area.verticalScrollBar().setValue(
-            self.parent.scroll_area.verticalScrollBar().maximum()))
+        QTimer.singleShot(0, self.transcript_view.scrollToBottom)
 
 
     def handle_resource_alert(self, overloaded, cpu, ram):
         if overloaded:
             alert = f"<b>[Alerte système]</b> CPU: {cpu:.1f}%, RAM: {ram:.1f}% ➜ surcharge détectée ⚠️"
-            self.scroll_layout.addWidget(QLabel(alert))
+            self.transcript.add_text(alert)
             print("[ALERTE] Ressources critiques détectées.")
         else:
             print(f"[INFO] Ressources OK — CPU: {cpu:.1f}%, RAM: {ram:.1f}%")
 
     def handle_resource_overload(self, message):
-        self.handle_resource_alert(True, 0, 0)
-        self.scroll_layout.addWidget(StyledLabel(f"<span style='color: orange; font-weight:bold;'>[ALERTE]</span> {message}"))
+        sample = self.resource_manager.sampler.latest()
+        self.handle_resource_alert(True, sample.cpu_percent, sample.ram_percent)
+        self.transcript.add_text(f"<span style='color: orange; font-weight:bold;'>[ALERTE]</span> {message}")
         print("[ALERTE] " + message)
 
     def handle_resource_ready(self):
-        self.handle_resource_alert(False, 0, 0)
+        sample = self.resource_manager.sampler.latest()
+        self.handle_resource_alert(False, sample.cpu_percent, sample.ram_percent)
         # Ici tu peux gérer la levée d’alerte si besoin (nettoyer UI par ex)
 
     def adjust_memory_threshold(self):
-        ram_available_gb = psutil.virtual_memory().available / (1024 ** 3)
+        ram_available_gb = self.resource_manager.sampler.sample_now().ram_available / (1024 ** 3)
         new_threshold = ram_available_gb * 0.6
         self.resource_manager.update_config(max_memory_gb=new_threshold)
         print(f"[CONFIG] Seuil mémoire ajusté dynamiquement à {new_threshold:.2f} GB")
@@ -475,20 +633,15 @@ class MainWindow(QWidget):
         msg_box.exec_()
 
     def try_run_ia(self, prompt):
-        if self.resource_manager.can_run():
-            def run():
-                response = self.images.generate(prompt)
-                print("[DEBUG] Réponse brute :", response)
-                QMetaObject.invokeMethod(
-                    self,
-                    "display_model_response",
-                    Qt.QueuedConnection,
-                    Q_ARG(str, response)
-                )
-            if not self.resource_manager.submit(run):
-                self.show_alert("Requête refusée : surcharge CPU ou RAM. Réessayez plus tard.")
-                print("[INFO] Requête refusée: surcharge CPU ou RAM")
-            else:
-                self.set_waiting_message("Alice réfléchit...")
+        if not self.resource_manager.submit(self.make_generation_task(prompt), job_class="llm"):
+            self.show_alert("Trop de demandes en attente. Réessayez dans un instant.")
+            print("[INFO] Requête refusée: file d'attente pleine")
         else:
-            self.show_alert("Ressources insuffisantes pour lancer la requête IA.")
+            self.set_waiting_message("Alice réfléchit...")
+
+    def on_scheduled_job_started(self, job_id, job_class):
+        # Sortie de file d'attente : la génération texte/code commence
+        if job_id == self.model_loader.job_id:
+            return
+        if job_class == "llm" and self.waiting_container.isVisible():
+            self.set_waiting_message("Alice réfléchit...")
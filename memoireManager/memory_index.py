@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+
+class HashingEmbedder:
+    """Vectorisation locale et sans modèle : mots et bigrammes hachés dans un espace de dimension fixe.
+
+    Purement lexicale (pas de synonymes ni de paraphrases) : c'est le repli quand aucun modèle
+    d'embedding n'est configuré ou disponible.
+    """
+
+    min_score = 0.2  # Seuil de similarité cosinus par défaut pour ce type de vecteurs
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def tokens(self, text):
+        words = re.findall(r"\w+", text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in self.tokens(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            # Le bit de poids fort donne le signe : limite l'effet des collisions
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed_batch(self, texts):
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([self.embed(text) for text in texts])
+
+
+class SentenceEmbedder:
+    """Embeddings sémantiques d'un modèle de phrases (transformers, moyenne des états cachés).
+
+    Les paraphrases se retrouvent même sans mot commun ; chargé en local, sur CPU.
+    """
+
+    min_score = 0.5
+
+    def __init__(self, model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2", batch_size=32):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+        self.dim = self.model.config.hidden_size
+        self.batch_size = batch_size
+
+    def embed(self, text):
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts):
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        chunks = []
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(texts[start:start + self.batch_size], padding=True, truncation=True,
+                                     max_length=256, return_tensors="pt")
+            with self.torch.no_grad():
+                hidden = self.model(**encoded).last_hidden_state
+            # Moyenne sur les vrais tokens (le padding est masqué)
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            chunks.append(self.torch.nn.functional.normalize(pooled, dim=1).numpy().astype(np.float32))
+        return np.vstack(chunks)
+
+
+def create_embedder(config_path="config.json"):
+    """Embedder choisi par la section "memory" de config.json ("embedder": "hashing" ou "sentence").
+    HashingEmbedder est le défaut ; si le modèle de phrases est indisponible, on s'y rabat."""
+    config = {}
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[MÉMOIRE] config.json illisible, embedder par défaut : {e}")
+
+    memory = config.get("memory", {})
+    backend = memory.get("embedder", "hashing").lower()
+    if backend == "sentence":
+        try:
+            embedder = SentenceEmbedder(**({"model_name": memory["embedding_model"]} if "embedding_model" in memory else {}))
+            print(f"[MÉMOIRE] Embeddings sémantiques prêts (dimension {embedder.dim}).")
+            return embedder
+        except Exception as e:
+            print(f"[MÉMOIRE] Modèle d'embedding indisponible ({e}), index lexical utilisé.")
+    elif backend != "hashing":
+        print(f"[MÉMOIRE] Embedder inconnu '{backend}', index lexical utilisé.")
+    return HashingEmbedder()
+
+
+class MemoryIndex:
+    """Index vectoriel en RAM des couples prompt/réponse de la table `memory` (recherche cosinus top-k)."""
+
+    def __init__(self, embedder=None, initial_capacity=1024):
+        self.embedder = embedder or HashingEmbedder()
+        self.vectors = np.zeros((initial_capacity, self.embedder.dim), dtype=np.float32)
+        self.entries = []  # [(id, prompt, response), ...] aligné sur les lignes de self.vectors
+        self.known_ids = set()
+        self.lock = threading.Lock()
+        self.ready = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def set_embedder(self, embedder):
+        """Change d'embedder ; l'index est vidé (les dimensions et les scores ne sont plus comparables)."""
+        with self.lock:
+            self.embedder = embedder
+            self.vectors = np.zeros((self.vectors.shape[0], embedder.dim), dtype=np.float32)
+            self.entries = []
+            self.known_ids = set()
+
+    def build_from(self, db_manager, batch_size=1000, embedder_factory=None):
+        """Charge toute la table par lots (à lancer dans un thread au démarrage).
+        embedder_factory charge l'embedder configuré dans ce même thread, avant la lecture de la table."""
+        if embedder_factory is not None:
+            self.set_embedder(embedder_factory())
+        start = time.perf_counter()
+        last_id = 0
+        while True:
+            rows = db_manager.fetch_memory_batch(after_id=last_id, limit=batch_size)
+            if not rows:
+                break
+            self.add_batch(rows)
+            last_id = rows[-1][0]
+        self.ready = True
+        print(f"[MÉMOIRE] Index construit : {len(self)} souvenirs en {time.perf_counter() - start:.2f}s")
+
+    def add(self, memory_id, prompt, response):
+        self.add_batch([(memory_id, prompt, response)])
+
+    def add_batch(self, rows):
+        rows = [row for row in rows if row[0] is None or row[0] not in self.known_ids]
+        if not rows:
+            return
+        embedder = self.embedder
+        vectors = embedder.embed_batch([f"{prompt}\n{response}" for _, prompt, response in rows])
+        with self.lock:
+            if embedder is not self.embedder:
+                return  # Embedder changé entre-temps : ces lignes sont déjà en base, build_from les relira
+            count = len(self.entries)
+            needed = count + len(rows)
+            if needed > self.vectors.shape[0]:
+                grown = np.zeros((max(needed, self.vectors.shape[0] * 2), self.embedder.dim), dtype=np.float32)
+                grown[:count] = self.vectors[:count]
+                self.vectors = grown
+            self.vectors[count:needed] = vectors
+            self.entries.extend(rows)
+            self.known_ids.update(row[0] for row in rows if row[0] is not None)
+
+    def remove(self, memory_id):
+        with self.lock:
+            for i, entry in enumerate(self.entries):
+                if entry[0] == memory_id:
+                    count = len(self.entries)
+                    self.vectors[i:count - 1] = self.vectors[i + 1:count]
+                    del self.entries[i]
+                    self.known_ids.discard(memory_id)
+                    break
+
+    def clear(self):
+        with self.lock:
+            self.entries = []
+            self.known_ids = set()
+
+    def search(self, query, k=3, min_score=None):
+        """Retourne [(score, prompt, response), ...] triés par similarité décroissante.
+        Sans min_score explicite, le seuil est celui de l'embedder (les échelles de score diffèrent)."""
+        if min_score is None:
+            min_score = self.embedder.min_score
+        query_vector = self.embedder.embed(query)
+        with self.lock:
+            count = len(self.entries)
+            if count == 0:
+                return []
+            scores = self.vectors[:count] @ query_vector
+            k = min(k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (float(scores[i]), self.entries[i][1], self.entries[i][2])
+                for i in top if scores[i] >= min_score
+            ]
@@ -1,10 +1,72 @@
-import mysql.connector
-from mysql.connector import Error
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QScrollArea, QMessageBox,
-    QHBoxLayout, QTextEdit, QFrame
+    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox,
+    QHBoxLayout, QLineEdit, QListView, QAbstractItemView
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer, QThreadPool, QMetaObject, pyqtSlot
+
+from utils.storage import create_storage
+from utils.utils import RunnableFunc
+
+
+class MemoryListModel(QAbstractListModel):
+    """Mémoires chargées page par page (pagination sur clé) au fil du défilement."""
+
+    IdRole = Qt.UserRole + 1
+
+    def __init__(self, db_manager, page_size=50, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.page_size = page_size
+        self.rows = []          # [(id, prompt, response), ...] par id décroissant
+        self.search = None
+        self.exhausted = False
+
+    def reset(self, search=None):
+        self.beginResetModel()
+        self.rows = []
+        self.search = search or None
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        before_id = self.rows[-1][0] if self.rows else None
+        page = self.db_manager.fetch_memory_page(before_id=before_id, limit=self.page_size, search=self.search)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        mem_id, prompt, response = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"Vous : {prompt}\nAlice : {response}"
+        if role == Qt.ToolTipRole:
+            return f"#{mem_id}"
+        if role == self.IdRole:
+            return mem_id
+        return None
+
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.rows[row]
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = True
+        self.endResetModel()
 
 
 class MemoryViewer(QWidget):
@@ -16,18 +78,11 @@ class MemoryViewer(QWidget):
         if style_sheet:
             self.setStyleSheet(style_sheet)
 
-        # Connexion MySQL
-        try:
-            self.conn = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="JOJOJOJO88",
-                database="ia_alice"
-            )
-            self.cursor = self.conn.cursor()
-            print("[MySQL] Connexion réussie.")
-        except Error as e:
-            print(f"[MySQL] Erreur de connexion : {e}")
+        # L'agent (s'il est fourni) tient l'index sémantique à garder synchronisé
+        self.agent = memory_data if hasattr(memory_data, "memory_index") else None
+        self.db_manager = create_storage()
+        # Vérification / création de l'index de recherche en arrière-plan (ALTER TABLE possible)
+        QThreadPool.globalInstance().start(RunnableFunc(self.prepare_search_index))
 
         # Layout principal
         self.layout = QVBoxLayout()
@@ -36,16 +91,35 @@ class MemoryViewer(QWidget):
         title.setStyleSheet("font-size: 16px; font-weight: bold;")
         self.layout.addWidget(title)
 
-        # Scroll Area
-        self.scroll_area = QScrollArea()
-        self.scroll_widget = QWidget()
-        self.scroll_layout = QVBoxLayout(self.scroll_widget)
-        self.scroll_area.setWidget(self.scroll_widget)
-        self.scroll_area.setWidgetResizable(True)
-        self.layout.addWidget(self.scroll_area)
+        # Recherche côté serveur (index FULLTEXT), déclenchée après une courte pause de frappe
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Rechercher dans la mémoire...")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.load_memory)
+        self.search_box.textChanged.connect(self.search_timer.start)
+        self.layout.addWidget(self.search_box)
+
+        # Liste paginée : une page est chargée à l'ouverture, les suivantes au défilement
+        self.model = MemoryListModel(self.db_manager, page_size=50, parent=self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setWordWrap(True)
+        self.list_view.setSpacing(4)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.layout.addWidget(self.list_view)
+
+        self.empty_label = QLabel("Aucune mémoire enregistrée.")
+        self.layout.addWidget(self.empty_label)
 
         # Boutons
         buttons_layout = QHBoxLayout()
+        self.delete_button = QPushButton("Supprimer")
+        self.delete_button.clicked.connect(self.delete_selected_memory)
+        buttons_layout.addWidget(self.delete_button)
+
         self.delete_all_button = QPushButton("Tout supprimer")
         self.delete_all_button.clicked.connect(self.delete_all_memory)
         buttons_layout.addWidget(self.delete_all_button)
@@ -59,43 +133,34 @@ class MemoryViewer(QWidget):
 
         self.load_memory()
 
+    def prepare_search_index(self):
+        if self.db_manager.ensure_fulltext_index():
+            try:
+                QMetaObject.invokeMethod(self, "on_search_index_ready", Qt.QueuedConnection)
+            except RuntimeError:
+                pass  # Fenêtre déjà fermée et détruite
+
+    @pyqtSlot()
+    def on_search_index_ready(self):
+        # Une recherche tapée avant la fin de la création de l'index est relancée
+        if self.search_box.text().strip():
+            self.load_memory()
+
     def load_memory(self):
-        try:
-            self.cursor.execute("SELECT id, prompt, response FROM memory")
-            records = self.cursor.fetchall()
-
-            if records:
-                for record in records:
-                    mem_id, prompt, response = record
-
-                    entry_frame = QFrame()
-                    entry_layout = QVBoxLayout(entry_frame)
-                    text = QTextEdit()
-                    text.setReadOnly(True)
-                    text.setPlainText(f"Vous : {prompt}\nAlice : {response}")
-                    entry_layout.addWidget(text)
-
-                    del_button = QPushButton("Supprimer")
-                    del_button.clicked.connect(lambda _, m_id=mem_id, f=entry_frame: self.delete_memory(m_id, f))
-                    entry_layout.addWidget(del_button, alignment=Qt.AlignRight)
-
-                    self.scroll_layout.addWidget(entry_frame)
-            else:
-                empty_label = QLabel("Aucune mémoire enregistrée.")
-                self.scroll_layout.addWidget(empty_label)
-
-        except Error as e:
-            print(f"[MySQL] Erreur de lecture de la mémoire : {e}")
-
-    def delete_memory(self, mem_id, frame):
-        try:
-            self.cursor.execute("DELETE FROM memory WHERE id = %s", (mem_id,))
-            self.conn.commit()
-            self.scroll_layout.removeWidget(frame)
-            frame.setParent(None)
-            frame.deleteLater()
-        except Error as e:
-            print(f"[MySQL] Erreur de suppression : {e}")
+        self.model.reset(search=self.search_box.text().strip())
+        self.empty_label.setVisible(self.model.rowCount() == 0)
+
+    def delete_selected_memory(self):
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            self.delete_memory(index.data(MemoryListModel.IdRole), index.row())
+
+    def delete_memory(self, mem_id, row):
+        self.db_manager.delete_memory_by_id(mem_id)
+        self.model.remove_row(row)
+        if self.agent is not None:
+            self.agent.memory_index.remove(mem_id)
+        self.empty_label.setVisible(self.model.rowCount() == 0)
 
     def delete_all_memory(self):
         confirm = QMessageBox.question(
@@ -103,32 +168,16 @@ class MemoryViewer(QWidget):
             QMessageBox.Yes | QMessageBox.No
         )
         if confirm == QMessageBox.Yes:
-            try:
-                self.cursor.execute("DELETE FROM memory")
-                self.conn.commit()
-                # Vider l'interface
-                while self.scroll_layout.count():
-                    child = self.scroll_layout.takeAt(0)
-                    if child.widget():
-                        child.widget().setParent(None)
-                        child.widget().deleteLater()
-            except Error as e:
-                print(f"[MySQL] Erreur lors de la suppression totale : {e}")
+            self.db_manager.delete_all_memories()
+            self.model.clear()
+            if self.agent is not None:
+                self.agent.memory_index.clear()
+            self.empty_label.setVisible(True)
 
     def closeEvent(self, event):
-        if self.conn.is_connected():
-            self.cursor.close()
-            self.conn.close()
-            print("[MySQL] Connexion fermée.")
         event.accept()
 
     def save_to_database(self, prompt, response):
-        try:
-            self.cursor.execute(
-                "INSERT INTO memory (prompt, response) VALUES (%s, %s)",
-                (prompt, response)
-            )
-            self.conn.commit()
-            print("[MySQL] Interaction sauvegardée.")
-        except Error as e:
-            print(f"[MySQL] Erreur lors de l'insertion : {e}")
+        memory_id = self.db_manager.save_memory(prompt, response)
+        if self.agent is not None and memory_id is not None:
+            self.agent.memory_index.add(memory_id, prompt, response)
@@ -0,0 +1,38 @@
+import threading
+import time
+
+
+class CancellationToken:
+    """Jeton d'annulation d'une génération, avec échéance optionnelle (secondes d'horloge murale).
+
+    Branché sur les critères d'arrêt de llama-cpp-python : ils sont évalués après chaque token,
+    le décodage s'arrête donc au plus un token après cancel() ou l'échéance.
+    """
+
+    def __init__(self, deadline=None):
+        self.event = threading.Event()
+        self.started_at = time.monotonic()
+        self.deadline_at = self.started_at + deadline if deadline else None
+        self.reason = None  # "annulé" ou "échéance"
+
+    def cancel(self):
+        if self.reason is None:
+            self.reason = "annulé"
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        if not self.event.is_set() and self.deadline_at is not None and time.monotonic() >= self.deadline_at:
+            self.reason = self.reason or "échéance"
+            self.event.set()
+        return self.event.is_set()
+
+    def should_stop(self, input_ids, logits):
+        return self.cancelled
+
+    def stopping_criteria(self):
+        try:
+            from llama_cpp import StoppingCriteriaList
+        except ImportError:  # Modèle de substitution (benchmarks) : une simple liste de critères
+            return [self.should_stop]
+        return StoppingCriteriaList([self.should_stop])
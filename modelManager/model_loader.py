@@ -0,0 +1,61 @@
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ModelLoader(QObject):
+    """Charge les modèles de l'agent en arrière-plan, via l'ordonnanceur commun.
+
+    Le chargement est une tâche "llm" prioritaire : les requêtes texte et code envoyées pendant
+    le chargement attendent derrière lui dans la file, puis partent dès que le modèle est prêt.
+    """
+
+    loading_started = pyqtSignal(str)           # nom du modèle
+    loading_progress = pyqtSignal(str)          # message d'étape
+    loading_finished = pyqtSignal(str, float)   # nom du modèle, durée en secondes
+    loading_failed = pyqtSignal(str, str)       # nom du modèle, erreur
+
+    LOAD_PRIORITY = 1000
+
+    def __init__(self, agent, scheduler):
+        super().__init__()
+        self.agent = agent
+        self.scheduler = scheduler
+        self.job_id = None
+        self.loading_model = None
+
+    @property
+    def loading(self):
+        return self.loading_model is not None
+
+    def load(self, model_name):
+        """Met le chargement en file ; renvoie False si la file de l'ordonnanceur est pleine."""
+        if model_name == self.loading_model:
+            return True
+        self.loading_model = model_name
+        self.loading_started.emit(model_name)
+        self.job_id = self.scheduler.submit("llm", self._run, model_name, priority=self.LOAD_PRIORITY)
+        if self.job_id is None:
+            self.loading_model = None
+            self.loading_failed.emit(model_name, "File d'attente pleine")
+            return False
+        return True
+
+    def _run(self, model_name):
+        start = time.perf_counter()
+        try:
+            ready = self.agent.load_model(model_name, on_progress=self.loading_progress.emit)
+            error = None if ready else "Le modèle n'a pas pu être chargé (voir alice_errors.log)."
+        except Exception as e:
+            error = str(e)
+        finally:
+            if self.loading_model == model_name:
+                self.loading_model = None
+
+        if error:
+            print(f"[MODÈLE] Échec du chargement de {model_name} : {error}")
+            self.loading_failed.emit(model_name, error)
+        else:
+            elapsed = time.perf_counter() - start
+            print(f"[MODÈLE] {model_name} prêt en {elapsed:.2f}s")
+            self.loading_finished.emit(model_name, elapsed)
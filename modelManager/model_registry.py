@@ -0,0 +1,111 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+
+import psutil
+
+
+class ModelRegistry:
+    """Registre partagé des modèles GGUF chargés (un seul chargement par chemin + paramètres)."""
+
+    _instance = None  # Singleton
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(ModelRegistry, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_memory_gb=None, max_memory_ratio=0.6, llama_factory=None):
+        if self._initialized:
+            return
+
+        total_ram_gb = psutil.virtual_memory().total / (1024 ** 3)
+        self.max_memory_gb = max_memory_gb if max_memory_gb is not None else total_ram_gb * max_memory_ratio
+        self.llama_factory = llama_factory  # Permet de remplacer Llama (tests, benchmarks)
+
+        self.lock = threading.RLock()
+        # clé -> {"model", "refcount", "size"} ; l'ordre donne le LRU (le plus ancien en tête)
+        self.entries = OrderedDict()
+
+        print(f"[INFO] ModelRegistry initialisé avec budget RAM de {self.max_memory_gb:.2f} GB")
+        self._initialized = True
+
+    @staticmethod
+    def make_key(model_path, params):
+        return os.path.abspath(model_path), tuple(sorted(params.items()))
+
+    def acquire(self, model_path, **params):
+        """Retourne l'instance Llama pour ce chemin/ces paramètres et incrémente son compteur."""
+        key = self.make_key(model_path, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["refcount"] += 1
+                self.entries.move_to_end(key)
+                print(f"[INFO] Modèle réutilisé depuis le registre : {model_path} (refs={entry['refcount']})")
+                return entry["model"]
+
+            size = os.path.getsize(model_path)
+            self._evict(reserve_bytes=size)
+
+            print(f"[INFO] Chargement du modèle : {model_path}")
+            model = self._create_model(model_path, params)
+            self.entries[key] = {"model": model, "refcount": 1, "size": size}
+            return model
+
+    def is_loaded(self, model_path, **params):
+        with self.lock:
+            return self.make_key(model_path, params) in self.entries
+
+    def release(self, model):
+        """Décrémente le compteur du modèle ; il reste en cache jusqu'à éviction."""
+        with self.lock:
+            for key, entry in self.entries.items():
+                if entry["model"] is model:
+                    entry["refcount"] = max(0, entry["refcount"] - 1)
+                    break
+            self._evict()
+
+    def loaded_bytes(self):
+        with self.lock:
+            return sum(entry["size"] for entry in self.entries.values())
+
+    def set_max_memory(self, max_memory_gb):
+        with self.lock:
+            self.max_memory_gb = max_memory_gb
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            for key in [k for k, e in self.entries.items() if e["refcount"] == 0]:
+                self._unload(key)
+
+    def _create_model(self, model_path, params):
+        if self.llama_factory is not None:
+            return self.llama_factory(model_path=model_path, **params)
+        from llama_cpp import Llama
+        return Llama(model_path=model_path, **params)
+
+    def _evict(self, reserve_bytes=0):
+        # Décharge les modèles inutilisés les plus anciens tant que le budget est dépassé
+        budget = self.max_memory_gb * (1024 ** 3)
+        for key in list(self.entries.keys()):
+            if self.loaded_bytes() + reserve_bytes <= budget:
+                break
+            if self.entries[key]["refcount"] == 0:
+                self._unload(key)
+
+    def _unload(self, key):
+        entry = self.entries.pop(key)
+        model = entry["model"]
+        close = getattr(model, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                print(f"[AVERTISSEMENT] Fermeture du modèle {key[0]} : {e}")
+        del entry, model
+        gc.collect()
+        print(f"[INFO] Modèle déchargé du registre : {key[0]}")
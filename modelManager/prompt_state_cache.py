@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+
+class PromptStateCache:
+    """Cache disque des états llama.cpp après évaluation d'un préfixe (préambule système, etc.).
+
+    Clé : empreinte du fichier GGUF + paramètres de chargement + texte du préfixe.
+    Les fichiers les moins récemment utilisés sont supprimés au-delà de max_size_mb.
+    """
+
+    def __init__(self, cache_dir="cache/prompt_states", max_size_mb=1024):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.fingerprints = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def model_fingerprint(self, model_path, chunk_size=16 * 1024 * 1024):
+        # Hachage du début et de la fin du fichier : rapide même pour un GGUF de 13 GB
+        stat = os.stat(model_path)
+        memo_key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime)
+        if memo_key not in self.fingerprints:
+            sha = hashlib.sha256(str(stat.st_size).encode("utf-8"))
+            with open(model_path, "rb") as f:
+                sha.update(f.read(chunk_size))
+                if stat.st_size > chunk_size:
+                    f.seek(max(chunk_size, stat.st_size - chunk_size))
+                    sha.update(f.read(chunk_size))
+            self.fingerprints[memo_key] = sha.hexdigest()
+        return self.fingerprints[memo_key]
+
+    def make_key(self, model_path, params, prefix):
+        payload = json.dumps({
+            "model": self.model_fingerprint(model_path),
+            "params": sorted(params.items()),
+            "prefix": prefix
+        }, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.state")
+
+    def get(self, key):
+        path = self.path_for(key)
+        with self.lock:
+            if not os.path.exists(path):
+                return None
+            try:
+                with open(path, "rb") as f:
+                    state = pickle.load(f)
+                os.utime(path)  # La date de modification sert d'horodatage LRU
+                return state
+            except Exception as e:
+                print(f"[AVERTISSEMENT] État de prompt illisible, suppression : {e}")
+                os.remove(path)
+                return None
+
+    def put(self, key, state):
+        path = self.path_for(key)
+        tmp_path = f"{path}.tmp"
+        with self.lock:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def size_bytes(self):
+        return sum(os.path.getsize(p) for p, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".state"):
+                path = os.path.join(self.cache_dir, name)
+                entries.append((path, os.path.getmtime(path)))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(os.path.getsize(p) for p, _ in entries)
+        for path, _ in entries:
+            if total <= self.max_size_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+            print(f"[INFO] État de prompt évincé du cache : {os.path.basename(path)}")
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Cache des réponses déterministes : LRU en mémoire + base SQLite persistante avec expiration."""
+
+    def __init__(self, db_path="cache/responses.db", max_entries=256, ttl_hours=24 * 7):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_hours * 3600
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        # Espaces seulement : la casse compte dans du code (getUser ≠ getuser)
+        return re.sub(r"\s+", " ", prompt.replace("#save", "")).strip()
+
+    def make_key(self, model_id, prompt, language=None, params=None):
+        payload = json.dumps({
+            "model": model_id,
+            "prompt": self.normalize_prompt(prompt),
+            "language": (language or "").lower(),
+            "params": sorted((params or {}).items())
+        }, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.memory:
+                response, created_at = self.memory[key]
+                if time.time() - created_at <= self.ttl_seconds:
+                    self.memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return response
+                del self.memory[key]  # Expirée : la ligne disque, plus ancienne ou égale, l'est aussi
+
+            row = self.conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and time.time() - row[1] <= self.ttl_seconds:
+                self.hits_disk += 1
+                self._remember(key, row[0], row[1])
+                return row[0]
+            if row:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        with self.lock:
+            created_at = time.time()
+            self._remember(key, response, created_at)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, created_at)
+            )
+            self.conn.commit()
+
+    def purge_expired(self):
+        with self.lock:
+            limit = time.time() - self.ttl_seconds
+            for key in [k for k, (_, created_at) in self.memory.items() if created_at < limit]:
+                del self.memory[key]
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (limit,))
+            self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def stats(self):
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "entries_memory": len(self.memory)
+        }
+
+    def _remember(self, key, response, created_at):
+        self.memory[key] = (response, created_at)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
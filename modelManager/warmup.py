@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+
+import psutil
+
+
+class ModelWarmup:
+    """Préchauffage d'un GGUF chargé en mmap : sans lui, la première requête paie les défauts
+    de page sur plusieurs Go de poids.
+
+    1. Lecture anticipée du fichier (posix_fadvise WILLNEED puis lecture séquentielle) sur un
+       thread de faible priorité, lancée pendant la construction du modèle ;
+    2. Petite évaluation factice une fois le modèle créé, pour toucher chaque couche.
+    """
+
+    def __init__(self, model_path, chunk_size=16 * 1024 * 1024, max_ram_ratio=0.9):
+        self.model_path = model_path
+        self.chunk_size = chunk_size
+        self.max_ram_ratio = max_ram_ratio
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.stats = {
+            "prefetch_method": None,
+            "prefetch_bytes": 0,
+            "prefetch_seconds": 0.0,
+            "eval_tokens": 0,
+            "eval_seconds": 0.0,
+        }
+
+    def start_prefetch(self):
+        size = os.path.getsize(self.model_path)
+        # Inutile (et nuisible : éviction d'autres pages) si le fichier ne tient pas en RAM
+        if size > psutil.virtual_memory().available * self.max_ram_ratio:
+            self.stats["prefetch_method"] = "ignorée (RAM insuffisante)"
+            print(f"[WARMUP] Lecture anticipée ignorée : {size / 1024 ** 3:.1f} GB > RAM disponible")
+            return
+        self.thread = threading.Thread(target=self._prefetch, args=(size,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    @staticmethod
+    def _lower_thread_priority():
+        # Sous Linux, setpriority sur le tid ne concerne que le thread courant
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+    def _prefetch(self, size):
+        self._lower_thread_priority()
+        start = time.perf_counter()
+        method = "lecture séquentielle"
+        done = 0
+        try:
+            with open(self.model_path, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    # Le noyau lance la lecture en tâche de fond ; la boucle ci-dessous garantit le résultat
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    method = "fadvise + lecture séquentielle"
+                buffer = bytearray(self.chunk_size)
+                while done < size and not self.stop_event.is_set():
+                    read = f.readinto(buffer)
+                    if not read:
+                        break
+                    done += read
+        except OSError as e:
+            print(f"[WARMUP] Lecture anticipée interrompue : {e}")
+        self.stats.update(prefetch_method=method, prefetch_bytes=done,
+                          prefetch_seconds=time.perf_counter() - start)
+
+    def evaluate(self, model, text=" Bonjour"):
+        """Évaluation factice de quelques tokens ; le cache KV est réinitialisé ensuite."""
+        start = time.perf_counter()
+        tokens = model.tokenize(text.encode("utf-8"))
+        model.reset()
+        model.eval(tokens)
+        model.reset()
+        self.stats.update(eval_tokens=len(tokens), eval_seconds=time.perf_counter() - start)
+
+    def run(self, model):
+        """Attend la fin de la lecture anticipée puis lance l'évaluation factice ; renvoie les statistiques."""
+        if self.thread is not None:
+            self.thread.join()
+        self.evaluate(model)
+        stats = self.stats
+        prefetch_s = stats["prefetch_seconds"]
+        rate = stats["prefetch_bytes"] / (1024 ** 2) / prefetch_s if prefetch_s else 0.0
+        print(f"[WARMUP] {os.path.basename(self.model_path)} : "
+              f"{stats['prefetch_bytes'] / 1024 ** 3:.2f} GB lus en {prefetch_s:.2f}s ({rate:.0f} MB/s, {stats['prefetch_method']}), "
+              f"évaluation factice de {stats['eval_tokens']} tokens en {stats['eval_seconds']:.2f}s")
+        return stats
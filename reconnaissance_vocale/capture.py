@@ -0,0 +1,100 @@
+import json
+from collections import deque
+
+import numpy as np
+
+
+class EnergyVAD:
+    """Détection d'activité vocale par énergie, vectorisée avec NumPy.
+
+    process() reçoit un bloc PCM 16 bits (plusieurs trames de frame_ms) et renvoie des événements :
+    ("start", audio) au début d'un énoncé (avec pre_roll_ms d'audio précédent), ("audio", audio)
+    pendant l'énoncé et ("end", b"") après hangover_ms de silence. Le plancher de bruit s'adapte
+    sur les trames silencieuses.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=30, start_ratio=3.0, min_rms=200.0,
+                 hangover_ms=600, pre_roll_ms=300, max_segment_s=15):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        self.frame_bytes = self.frame_len * 2
+        self.start_ratio = start_ratio
+        self.min_rms = min_rms
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.max_segment_frames = int(max_segment_s * 1000 / frame_ms)
+        self.pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self.noise_floor = None
+        self.remainder = b""
+        self.reset()
+
+    def reset(self):
+        self.in_speech = False
+        self.silent_frames = 0
+        self.segment_frames = 0
+        self.pre_roll.clear()
+        self.remainder = b""
+
+    def frame_rms(self, pcm16):
+        """RMS de chaque trame complète du bloc (un seul calcul NumPy pour tout le bloc)."""
+        samples = np.frombuffer(pcm16, dtype=np.int16)
+        count = len(samples) // self.frame_len
+        frames = samples[:count * self.frame_len].reshape(count, self.frame_len).astype(np.float32)
+        return np.sqrt(np.mean(frames * frames, axis=1))
+
+    def process(self, pcm16):
+        data = self.remainder + pcm16
+        usable = len(data) - len(data) % self.frame_bytes
+        self.remainder = data[usable:]
+        if not usable:
+            return []
+
+        rms = self.frame_rms(data[:usable])
+        if self.noise_floor is None:
+            self.noise_floor = float(np.median(rms))
+        threshold = max(self.min_rms, self.noise_floor * self.start_ratio)
+        voiced = rms > threshold
+
+        events = []
+        for index, is_voiced in enumerate(voiced):
+            frame = data[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            if not self.in_speech:
+                if is_voiced:
+                    self.in_speech = True
+                    self.silent_frames = 0
+                    self.segment_frames = 1
+                    events.append(("start", b"".join(self.pre_roll) + frame))
+                    self.pre_roll.clear()
+                else:
+                    # Silence : le plancher de bruit suit lentement l'ambiance
+                    self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(rms[index])
+                    self.pre_roll.append(frame)
+                continue
+
+            self.segment_frames += 1
+            self.silent_frames = 0 if is_voiced else self.silent_frames + 1
+            events.append(("audio", frame))
+            if self.silent_frames >= self.hangover_frames or self.segment_frames >= self.max_segment_frames:
+                self.in_speech = False
+                events.append(("end", b""))
+        return events
+
+
+class WakeWordDetector:
+    """Mot d'éveil local : Vosk limité à une grammaire de quelques mots, bien plus léger qu'un décodage libre."""
+
+    def __init__(self, model, sample_rate=16000, wake_word="alice"):
+        from vosk import KaldiRecognizer
+
+        self.wake_word = wake_word
+        self.recognizer = KaldiRecognizer(model, sample_rate, json.dumps([wake_word, "[unk]"]))
+
+    def accept_audio(self, pcm16):
+        """True dès que le mot d'éveil apparaît dans l'hypothèse courante."""
+        if self.recognizer.AcceptWaveform(pcm16):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        return self.wake_word in text.split()
+
+    def reset(self):
+        self.recognizer.Reset()
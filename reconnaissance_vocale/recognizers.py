@@ -0,0 +1,115 @@
+import json
+import os
+
+
+class SpeechRecognizerBackend:
+    """Interface des moteurs de reconnaissance vocale.
+
+    Le flux audio est du PCM 16 bits mono à sample_rate Hz. accept_audio() reçoit les trames au fil
+    de la capture et renvoie (final, texte) : texte partiel tant que final est False, phrase
+    complète quand le moteur détecte la fin de l'énoncé. finish() force la fin de l'énoncé en cours.
+    """
+
+    name = "base"
+    streaming = False  # True : hypothèses partielles et détection de fin d'énoncé intégrées
+    sample_rate = 16000
+
+    def accept_audio(self, pcm16: bytes):
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        raise NotImplementedError
+
+    def reset(self):
+        self.finish()
+
+    def transcribe(self, pcm16: bytes) -> str:
+        """Transcription d'un segment complet."""
+        self.reset()
+        self.accept_audio(pcm16)
+        return self.finish()
+
+
+class VoskRecognizer(SpeechRecognizerBackend):
+    """Reconnaissance locale en streaming (Vosk / Kaldi, CPU) : aucun aller-retour réseau."""
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path="modelManager/vosk-model-small-fr-0.22", sample_rate=16000, grammar=None):
+        from vosk import Model, SetLogLevel
+
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Modèle Vosk introuvable : {model_path}")
+        SetLogLevel(-1)
+        self.sample_rate = sample_rate
+        self.model = Model(model_path)
+        self.grammar = grammar
+        self.recognizer = self._make_recognizer()
+
+    def _make_recognizer(self):
+        from vosk import KaldiRecognizer
+        if self.grammar:
+            # Vocabulaire restreint (ex. mot d'éveil) : décodage bien plus léger
+            return KaldiRecognizer(self.model, self.sample_rate, json.dumps(self.grammar, ensure_ascii=False))
+        return KaldiRecognizer(self.model, self.sample_rate)
+
+    def accept_audio(self, pcm16: bytes):
+        if self.recognizer.AcceptWaveform(pcm16):
+            return True, json.loads(self.recognizer.Result()).get("text", "")
+        return False, json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+    def finish(self) -> str:
+        return json.loads(self.recognizer.FinalResult()).get("text", "")
+
+    def reset(self):
+        self.recognizer.Reset()
+
+
+class GoogleRecognizer(SpeechRecognizerBackend):
+    """Service en ligne de speech_recognition (comportement historique) : énoncé complet, pas de partiels."""
+
+    name = "google"
+    streaming = False
+
+    def __init__(self, language="fr-FR", sample_rate=16000):
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+        self.sample_rate = sample_rate
+        self.buffer = bytearray()
+
+    def accept_audio(self, pcm16: bytes):
+        self.buffer.extend(pcm16)
+        return False, ""
+
+    def finish(self) -> str:
+        audio, self.buffer = bytes(self.buffer), bytearray()
+        if not audio:
+            return ""
+        try:
+            return self.recognizer.recognize_google(self.sr.AudioData(audio, self.sample_rate, 2), language=self.language)
+        except self.sr.UnknownValueError:
+            return ""
+
+    def reset(self):
+        self.buffer = bytearray()
+
+
+def create_recognizer(config=None):
+    """Moteur choisi par la section "speech" de config.json ("backend": "vosk" ou "google").
+    Vosk est le défaut ; s'il est indisponible (paquet ou modèle absent), on se rabat sur Google."""
+    speech = (config or {}).get("speech", {})
+    backend = speech.get("backend", "vosk").lower()
+    sample_rate = speech.get("sample_rate", 16000)
+
+    if backend == "vosk":
+        try:
+            recognizer = VoskRecognizer(speech.get("vosk_model", "modelManager/vosk-model-small-fr-0.22"), sample_rate)
+            print("[VOIX] Reconnaissance locale Vosk prête.")
+            return recognizer
+        except Exception as e:
+            print(f"[VOIX] Vosk indisponible ({e}), reconnaissance Google utilisée.")
+    return GoogleRecognizer(speech.get("language", "fr-FR"), sample_rate)
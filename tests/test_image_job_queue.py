@@ -0,0 +1,59 @@
+import threading
+import time
+
+from PyQt5.QtCore import QCoreApplication
+
+from gestionnaire_ressources.job_scheduler import JobScheduler
+from imagesManager.image_job_queue import ImageJobQueue
+
+
+class BlockingAgent:
+    """Agent factice : la génération d'image attend qu'on la libère."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate_image(self, prompt, on_progress=None, cancel_event=None, slot=0, **options):
+        self.release.wait(5)
+        return f"[Image générée] #image {prompt}.png"
+
+
+def test_cancel_pending_job_from_slot_calling_active_jobs():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    agent = BlockingAgent()
+    scheduler = JobScheduler()
+    queue = ImageJobQueue(agent, max_concurrent=1, scheduler=scheduler)
+    seen = []
+
+    def on_cancelled(job_id):
+        # Comme Image_Manager.on_job_cancelled -> end_job : le slot relit l'état de la file.
+        # Verrou encore tenu = active_jobs() bloquerait définitivement le thread GUI
+        free = queue.lock.acquire(blocking=False)
+        if free:
+            queue.lock.release()
+            seen.append((job_id, queue.active_jobs()))
+        else:
+            seen.append((job_id, "verrou tenu"))
+
+    queue.job_cancelled.connect(on_cancelled)
+    finished = []
+    scheduler.job_finished.connect(lambda job_id, job_class: finished.append(job_id))
+
+    running = queue.submit("premier")
+    pending = queue.submit("second")
+    deadline = time.monotonic() + 5
+    while not queue.active_jobs() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    try:
+        assert queue.cancel(pending)  # Thread GUI : le slot s'exécute immédiatement
+        assert seen == [(pending, [running])]
+    finally:
+        agent.release.set()
+        # Laisse le job en cours se terminer avant de détruire l'application Qt
+        deadline = time.monotonic() + 5
+        while running not in finished and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        scheduler.shutdown()
@@ -1,12 +1,175 @@
 # Gestion des données et sauvegarde
-class DatabaseHandler:
-    def __init__(self, db_file='interactions.db'):
+import sqlite3
+import threading
+
+from utils.storage import MemoryStorage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_memory_created_at ON memory (created_at);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+    prompt, response, content='memory', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS memory_fts_insert AFTER INSERT ON memory BEGIN
+    INSERT INTO memory_fts (rowid, prompt, response) VALUES (new.id, new.prompt, new.response);
+END;
+CREATE TRIGGER IF NOT EXISTS memory_fts_delete AFTER DELETE ON memory BEGIN
+    INSERT INTO memory_fts (memory_fts, rowid, prompt, response) VALUES ('delete', old.id, old.prompt, old.response);
+END;
+CREATE TRIGGER IF NOT EXISTS memory_fts_update AFTER UPDATE ON memory BEGIN
+    INSERT INTO memory_fts (memory_fts, rowid, prompt, response) VALUES ('delete', old.id, old.prompt, old.response);
+    INSERT INTO memory_fts (rowid, prompt, response) VALUES (new.id, new.prompt, new.response);
+END;
+"""
+
+INSERT_MEMORY = "INSERT INTO memory (prompt, response) VALUES (?, ?)"
+
+
+class DatabaseHandler(MemoryStorage):
+    """Backend mémoire SQLite embarqué : aucune dépendance à un serveur.
+
+    Une connexion par thread (WAL : lectures concurrentes pendant une écriture), fermée après la fin du thread,
+    requêtes paramétrées constantes gardées en cache par sqlite3, recherche FTS5.
+    """
+
+    def __init__(self, db_file='interactions.db', busy_timeout_ms=5000):
         self.db_file = db_file
+        self.busy_timeout_ms = busy_timeout_ms
+        self.connections = {}  # id du thread -> connexion
+        self.lock = threading.Lock()
+        self.fts_enabled = False
+        self._init_schema()
+
+    def _connection(self):
+        thread_id = threading.get_ident()
+        conn = self.connections.get(thread_id)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            with self.lock:
+                self.connections[thread_id] = conn
+            self._close_dead_connections()
+        return conn
+
+    def _close_dead_connections(self):
+        # Les tâches de l'ordonnanceur tournent chacune dans un thread éphémère : sans ce ménage,
+        # chaque thread terminé laisserait une connexion (et un lecteur WAL) ouverte
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self.lock:
+            dead = [thread_id for thread_id in self.connections if thread_id not in alive]
+            closing = [self.connections.pop(thread_id) for thread_id in dead]
+        for conn in closing:
+            conn.close()
+
+    def _init_schema(self):
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            print(f"[SQLite] FTS5 indisponible, recherche par LIKE : {e}")
+        conn.commit()
+
+    def save_memory(self, prompt: str, response: str):
+        try:
+            return self.save_memory_batch([(prompt, response)])[0]
+        except sqlite3.Error as e:
+            print(f"[ERREUR] [MÉMOIRE] Échec de la sauvegarde en base de données : {str(e)}")
+            return None
+
+    def save_memory_batch(self, rows):
+        conn = self._connection()
+        ids = []
+        with conn:  # Une seule transaction pour tout le lot
+            for prompt, response in rows:
+                ids.append(conn.execute(INSERT_MEMORY, (prompt, response)).lastrowid)
+        return ids
+
+    def _fetch(self, query, params=()):
+        try:
+            return self._connection().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"[SQLite] Erreur de lecture : {e}")
+            return []
+
+    def fetch_memory(self, limit=100):
+        return self._fetch("SELECT prompt, response FROM memory ORDER BY id DESC LIMIT ?", (limit,))
+
+    def fetch_memory_batch(self, after_id=0, limit=1000):
+        return self._fetch("SELECT id, prompt, response FROM memory WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+
+    def fetch_last_memories(self, limit=5):
+        return self._fetch("SELECT prompt, response FROM memory ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def ensure_fulltext_index(self):
+        return self.fts_enabled
+
+    @staticmethod
+    def to_fts_query(search: str) -> str:
+        # "trier liste" -> '"trier"* "liste"*' : tous les mots (ET implicite), préfixes acceptés
+        words = [w.strip('"*') for w in search.split()]
+        return " ".join('"' + w.replace('"', '""') + '"*' for w in words if w)
+
+    def fetch_memory_page(self, before_id=None, limit=50, search=None):
+        """Page de mémoires (id décroissant) par pagination sur clé, filtrée par FTS5 si besoin."""
+        conditions = []
+        params = []
+        if before_id is not None:
+            conditions.append("id < ?")
+            params.append(before_id)
+        if search and search.strip():
+            if self.fts_enabled and self.to_fts_query(search):
+                conditions.append("id IN (SELECT rowid FROM memory_fts WHERE memory_fts MATCH ?)")
+                params.append(self.to_fts_query(search))
+            else:
+                for word in search.split():
+                    conditions.append("(prompt LIKE ? OR response LIKE ?)")
+                    params.extend([f"%{word}%"] * 2)
+
+        query = "SELECT id, prompt, response FROM memory"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return self._fetch(query, tuple(params))
+
+    def delete_memory_by_id(self, memory_id: int):
+        """Supprime une entrée mémoire spécifique par son ID."""
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM memory WHERE id = ?", (memory_id,))
+            print(f"[BDD] Mémoire ID {memory_id} supprimée.")
+        except sqlite3.Error as e:
+            print(f"[ERREUR] Suppression mémoire ID {memory_id} : {e}")
+
+    def delete_all_memories(self):
+        try:
+            with self._connection() as conn:
+                conn.execute("DELETE FROM memory")
+            print("[BDD] Toutes les mémoires ont été supprimées.")
+        except sqlite3.Error as e:
+            print(f"[ERREUR] Suppression totale des mémoires : {e}")
+
+    def close(self):
+        # Les connexions seront rouvertes à la demande si l'objet est réutilisé
+        with self.lock:
+            connections, self.connections = list(self.connections.values()), {}
+        for conn in connections:
+            conn.close()
 
     def save_interaction(self, interaction):
-        # Code pour sauvegarder les interactions dans une base de données SQLite
-        pass
+        self.save_memory(interaction["prompt"], interaction["response"])
 
     def load_interactions(self):
-        # Code pour charger les interactions
-        return []
+        return [{"prompt": prompt, "response": response} for prompt, response in self.fetch_memory()]
@@ -0,0 +1,36 @@
+import importlib
+import sys
+import threading
+
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """Module chargé au premier accès à l'un de ses attributs (import différé des sous-systèmes lourds)."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "chargé" if self.__dict__["_module"] is not None else "différé"
+        return f"<LazyModule {self.__dict__['_name']} ({state})>"
+
+
+def lazy_import(name):
+    """Renvoie le module s'il est déjà importé, sinon un proxy qui l'importera au premier usage."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
@@ -0,0 +1,81 @@
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Mesure du démarrage (app.py --profile-startup) : temps d'import par module et durée de chaque étape.
+
+    Le temps d'import est mesuré à la première importation de chaque module, en inclusif
+    (sous-modules compris) et en propre (sans ses imports imbriqués). La pile des imports en
+    cours est propre à chaque thread : un import fait en arrière-plan ne fausse pas le temps
+    propre des modules importés en même temps sur le thread principal.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.imports = {}   # module -> [inclusif, propre]
+        self.stages = []    # [(étape, durée, instant de fin depuis le lancement)]
+        self.local = threading.local()  # .stack : imports en cours dans ce thread
+        self.original_import = None
+
+    def install(self):
+        self.original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.imports.setdefault(name, [elapsed, elapsed - nested])
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.stages.append((name, end - start, end - self.start))
+
+    def report(self, top=25, output_path="cache/startup_profile.json"):
+        self.uninstall()
+        total = time.perf_counter() - self.start
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+
+        print(f"\n[PROFIL] Démarrage : {total:.3f}s")
+        print("[PROFIL] Étapes :")
+        for name, duration, at in self.stages:
+            print(f"    {name:<40} {duration * 1000:9.1f} ms   (t={at:.3f}s)")
+        print("[PROFIL] Imports les plus lents (inclusif / propre) :")
+        for name, (inclusive, own) in slowest:
+            print(f"    {name:<40} {inclusive * 1000:9.1f} ms   {own * 1000:9.1f} ms")
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "total_s": total,
+                "stages": [{"name": n, "duration_s": d, "at_s": a} for n, d, a in self.stages],
+                "imports": {n: {"inclusive_s": i, "own_s": o} for n, (i, o) in self.imports.items()}
+            }, f, indent=2)
+        print(f"[PROFIL] Détail complet : {output_path}")
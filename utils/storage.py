@@ -0,0 +1,65 @@
+import json
+import os
+
+
+class MemoryStorage:
+    """Interface commune des backends de mémoire (MySQL, SQLite).
+
+    Les lignes renvoyées sont des tuples : (prompt, response) pour fetch_memory / fetch_last_memories,
+    (id, prompt, response) pour fetch_memory_batch / fetch_memory_page.
+    """
+
+    def save_memory(self, prompt: str, response: str):
+        """Insère une mémoire et renvoie son id (None en cas d'échec)."""
+        raise NotImplementedError
+
+    def save_memory_batch(self, rows):
+        """Insère [(prompt, response), ...] en une transaction, renvoie les ids ; lève en cas d'échec."""
+        raise NotImplementedError
+
+    def fetch_memory(self, limit=100):
+        raise NotImplementedError
+
+    def fetch_memory_batch(self, after_id=0, limit=1000):
+        raise NotImplementedError
+
+    def fetch_memory_page(self, before_id=None, limit=50, search=None):
+        raise NotImplementedError
+
+    def fetch_last_memories(self, limit=5):
+        raise NotImplementedError
+
+    def ensure_fulltext_index(self):
+        """Prépare l'index de recherche plein texte ; renvoie False s'il est indisponible."""
+        raise NotImplementedError
+
+    def delete_memory_by_id(self, memory_id: int):
+        raise NotImplementedError
+
+    def delete_all_memories(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def create_storage(config_path="config.json"):
+    """Backend choisi par la clé "storage" de config.json : "mysql" (défaut) ou "sqlite".
+    Pour SQLite, la section "sqlite" peut préciser "db_file"."""
+    config = {}
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[STOCKAGE] config.json illisible, backend par défaut : {e}")
+
+    backend = config.get("storage", "mysql").lower()
+    if backend == "sqlite":
+        from utils.database_handler import DatabaseHandler
+        return DatabaseHandler(**config.get("sqlite", {}))
+    if backend != "mysql":
+        print(f"[STOCKAGE] Backend inconnu '{backend}', MySQL utilisé.")
+
+    from db_mysql_Manager.mysql_manager import MySQLManager
+    return MySQLManager()
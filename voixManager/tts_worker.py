@@ -0,0 +1,125 @@
+import queue
+import re
+import threading
+
+# Fin de phrase : ponctuation forte suivie d'un espace, ou retour à la ligne
+SENTENCE_END = re.compile(r"(?<=[.!?…:;])\s+|\n+")
+
+
+def split_sentences(text, min_length=12):
+    """Découpe un texte en phrases ; les fragments trop courts sont rattachés à la phrase suivante."""
+    sentences = []
+    current = ""
+    for part in SENTENCE_END.split(text):
+        current = f"{current} {part}".strip() if current else part.strip()
+        if len(current) >= min_length:
+            sentences.append(current)
+            current = ""
+    if current:
+        sentences.append(current)
+    return sentences
+
+
+class TTSWorker:
+    """Synthèse vocale dans un thread dédié (pyttsx3 n'est utilisé que depuis ce thread).
+
+    say() met un texte en file phrase par phrase ; feed() reçoit les tokens d'une réponse en
+    streaming et envoie chaque phrase dès qu'elle est complète, flush() envoie le reste.
+    interrupt() vide la file et coupe la phrase en cours au mot suivant.
+    """
+
+    def __init__(self, voice_hint="french", rate=None):
+        self.voice_hint = voice_hint
+        self.rate = rate
+        self.queue = queue.Queue()
+        self.generation = 0          # Incrémenté à chaque interruption : les phrases plus anciennes sont ignorées
+        self.buffer = ""             # Tokens en attente de fin de phrase (feed)
+        self.lock = threading.Lock()
+        self.speaking = threading.Event()
+        self.engine = None
+        self.current_generation = 0
+        self.thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self.thread.start()
+
+    def say(self, text):
+        with self.lock:
+            generation = self.generation
+        for sentence in split_sentences(text):
+            self.queue.put((generation, sentence))
+
+    def feed(self, token):
+        with self.lock:
+            self.buffer += token
+            parts = SENTENCE_END.split(self.buffer)
+            if len(parts) < 2:
+                return
+            # Le dernier morceau n'est peut-être pas terminé : il reste dans le tampon
+            complete, self.buffer = " ".join(parts[:-1]), parts[-1]
+            generation = self.generation
+        for sentence in split_sentences(complete):
+            self.queue.put((generation, sentence))
+
+    def flush(self):
+        with self.lock:
+            rest, self.buffer = self.buffer.strip(), ""
+            generation = self.generation
+        if rest:
+            self.queue.put((generation, rest))
+
+    def interrupt(self):
+        with self.lock:
+            self.generation += 1
+            self.buffer = ""
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def is_speaking(self):
+        return self.speaking.is_set() or not self.queue.empty()
+
+    def shutdown(self):
+        self.interrupt()
+        self.queue.put(None)
+        self.thread.join(timeout=2)
+
+    def _init_engine(self):
+        import pyttsx3
+        engine = pyttsx3.init()
+        for voice in engine.getProperty('voices'):
+            if self.voice_hint in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        if self.rate:
+            engine.setProperty('rate', self.rate)
+        # Appelé par le moteur à chaque mot (dans ce thread) : arrêt au mot suivant après interrupt()
+        engine.connect('started-word', self._on_word)
+        return engine
+
+    def _on_word(self, name, location, length):
+        if self.current_generation != self.generation:
+            self.engine.stop()
+
+    def _run(self):
+        try:
+            self.engine = self._init_engine()
+        except Exception as e:
+            print(f"[TTS] Synthèse vocale indisponible : {e}")
+
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            generation, sentence = item
+            if self.engine is None or generation != self.generation:
+                continue
+            self.current_generation = generation
+            self.speaking.set()
+            try:
+                self.engine.say(sentence)
+                self.engine.runAndWait()
+            except Exception as e:
+                print(f"[TTS] Erreur de synthèse : {e}")
+            finally:
+                self.speaking.clear()